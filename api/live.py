@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+from asie import snapshot
+
+logger = logging.getLogger("asie.api")
+
+# Endpoints whose responses depend on each snapshot table; sent with every diff
+# so dashboards re-fetch only what changed
+TABLE_ROUTES: Dict[str, List[str]] = {
+    "metrics_state_M.parquet": ["/api/meta", "/api/state/summary", "/api/state/table", "/api/timeseries"],
+    "metrics_district_M.parquet": ["/api/district/summary", "/api/district/table", "/api/timeseries"],
+    "anomalies_state_M.parquet": ["/api/anomalies?level=state"],
+    "anomalies_district_M.parquet": ["/api/anomalies?level=district"],
+    "forecast_state.parquet": ["/api/timeseries"],
+    "forecast_district.parquet": ["/api/timeseries"],
+}
+# Comment line sent on idle streams so proxies keep the connection open
+KEEPALIVE_SECONDS = 15.0
+# Undelivered events per client before it is told to resync instead
+MAX_QUEUED_EVENTS = 32
+
+
+def with_routes(diff: Dict[str, Any]) -> Dict[str, Any]:
+    routes = sorted({route for name in diff["changed_tables"] for route in TABLE_ROUTES.get(name, [])})
+    return {**diff, "refetch": routes}
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class LiveHub:
+    """Pushes snapshot diffs to this worker's server-sent-event clients.
+
+    One background task per worker follows the published snapshot through
+    the shared ``SnapshotReader``; when the version moves, the precomputed
+    ``diff.json`` files in between are sent to every subscriber. Clients
+    that fall behind or ask for a pruned version get a ``reset`` event.
+    """
+
+    def __init__(self, reader: snapshot.SnapshotReader, poll_interval: float):
+        self.reader = reader
+        self.poll_interval = poll_interval
+        self.version = reader.version
+        self._clients: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    def events_since(self, since: Optional[str]) -> List[str]:
+        """Events a client at version ``since`` needs to reach the hub's version."""
+        if since == self.version or self.version is None:
+            return []
+        chain = snapshot.diffs_since(self.reader.root, since, self.version) if since else None
+        if chain is None:
+            return [format_event("reset", {"version": self.version}, self.version)]
+        return [format_event("diff", with_routes(diff), diff["version"]) for diff in chain]
+
+    async def _follow(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                manifest = await run_in_threadpool(self.reader.manifest)
+                latest = manifest["version"] if manifest else None
+                if latest == self.version:
+                    continue
+                previous, self.version = self.version, latest
+                events = await run_in_threadpool(self.events_since, previous)
+            except Exception:
+                logger.exception("Live update poll failed")
+                continue
+            for queue in list(self._clients):
+                self._push(queue, events)
+
+    def _push(self, queue: asyncio.Queue, events: List[str]) -> None:
+        if queue.qsize() + len(events) > MAX_QUEUED_EVENTS:
+            # Slow client: drop its backlog and have it re-fetch everything
+            while not queue.empty():
+                queue.get_nowait()
+            events = [format_event("reset", {"version": self.version}, self.version)]
+        for event in events:
+            queue.put_nowait(event)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._follow())
+        queue: asyncio.Queue = asyncio.Queue()
+        self._clients.add(queue)
+        try:
+            yield format_event("hello", {"version": self.version}, self.version)
+            if last_event_id:
+                for event in await run_in_threadpool(self.events_since, last_event_id):
+                    yield event
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self._clients.discard(queue)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
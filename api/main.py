@@ -1,17 +1,51 @@
 from __future__ import annotations
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import logging
+import os
+import sys
+import threading
 from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import pandas as pd
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
+
+from .lazy import lazy_import
+
+# pandas/pyarrow load on first use so health checks and /api/meta (served from
+# the snapshot manifest) never pay for them
+pd = lazy_import("pandas")
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT / "data" / "processed"
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+from asie import snapshot
+
+from .live import LiveHub, with_routes
+from .query import QUERY_AGGS, QUERY_GROUP_COLS, QUERY_MAX_ROWS, aggregate_frame, create_engine
+from .telemetry import RequestMetrics, TimingMiddleware
+
+logger = logging.getLogger("asie.api")
+
+DATA_DIR = Path(os.environ.get("ASIE_DATA_DIR", ROOT / "data" / "processed"))
 PLOTS_DIR = ROOT / "reports" / "plots"
+# "auto" (use data/processed/snapshot when present), "off", or "require"
+SNAPSHOT_MODE = os.environ.get("ASIE_SNAPSHOT", "auto").lower()
+# How often workers check for a newly published snapshot version
+SNAPSHOT_POLL_SECONDS = float(os.environ.get("ASIE_SNAPSHOT_POLL", "2"))
+# Load pandas and the metrics tables in a background thread once the worker is ready
+WARM_ON_STARTUP = os.environ.get("ASIE_WARM", "1") != "0"
 
 INDEX_COLUMNS = [
     "digital_inclusion_index",
@@ -21,6 +55,9 @@ INDEX_COLUMNS = [
     "biometric_failure_risk_score",
 ]
 
+# "pandas" (default), "duckdb" or "auto" (duckdb when installed)
+QUERY_BACKEND = os.environ.get("ASIE_QUERY_BACKEND", "pandas")
+
 app = FastAPI(title="ASIE Governance API", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
@@ -28,20 +65,81 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"]
 )
+request_metrics = RequestMetrics(origin=_IMPORT_STARTED)
+app.add_middleware(TimingMiddleware, metrics=request_metrics)
 
 if PLOTS_DIR.exists():
     app.mount("/charts", StaticFiles(directory=PLOTS_DIR), name="charts")
 
 
-@lru_cache(maxsize=8)
+_engine = create_engine(QUERY_BACKEND, DATA_DIR)
+
+
+def _open_snapshot() -> Optional[snapshot.SnapshotReader]:
+    if SNAPSHOT_MODE == "off":
+        return None
+    reader = snapshot.SnapshotReader(DATA_DIR / snapshot.SNAPSHOT_DIR, poll_interval=SNAPSHOT_POLL_SECONDS)
+    if reader.version is None and SNAPSHOT_MODE == "require":
+        raise RuntimeError(f"ASIE_SNAPSHOT=require but no snapshot in {reader.root}")
+    return reader
+
+
+_snapshot = _open_snapshot()
+
+
+def _snapshot_manifest() -> Optional[Dict]:
+    return _snapshot.manifest() if _snapshot is not None else None
+
+
+def _snapshot_file(name: str) -> Optional[Path]:
+    """Arrow IPC file for ``name`` in the published snapshot, unless it is stale."""
+    manifest = _snapshot_manifest()
+    if manifest is None or name not in manifest["tables"]:
+        return None
+    src = DATA_DIR / name
+    if src.exists() and src.stat().st_mtime > manifest["tables"][name]["source_mtime"]:
+        return None
+    return _snapshot.root / manifest["version"] / manifest["tables"][name]["file"]
+
+
+def _on_snapshot_switch(old: Optional[str], new: Optional[str]) -> None:
+    # Drop frames mapped from the previous version; they are re-mapped from the new one on demand
+    _load_parquet.cache_clear()
+    _load_forecast.cache_clear()
+    _series_index.cache_clear()
+    _merged_sketch.cache_clear()
+    _scored_anomalies.cache_clear()
+    logger.info("Snapshot switched %s -> %s", old, new)
+
+
+if _snapshot is not None:
+    _snapshot.on_switch.append(_on_snapshot_switch)
+
+_live = LiveHub(_snapshot, poll_interval=SNAPSHOT_POLL_SECONDS) if _snapshot is not None else None
+
+
+# Tables read through _load_parquet: metrics and anomalies for state/district (4), plus
+# three rollups and one sketch table each for district/pincode (8); none should evict another
+PARQUET_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=PARQUET_CACHE_SIZE)
 def _load_parquet(name: str) -> pd.DataFrame:
+    snap = _snapshot_file(name)
+    if snap is not None:
+        return snapshot.read_frame(snap)
     path = DATA_DIR / name
     if not path.exists():
         raise FileNotFoundError(f"Missing parquet: {path}")
     return pd.read_parquet(path)
 
 
+@lru_cache(maxsize=4)
 def _load_forecast(name: str) -> Optional[pd.DataFrame]:
+    snap = _snapshot_file(name)
+    if snap is not None:
+        # Snapshot forecasts already carry timestamp periods
+        return snapshot.read_frame(snap)
     path = DATA_DIR / name
     if not path.exists():
         return None
@@ -76,11 +174,49 @@ def _available_periods(df: pd.DataFrame) -> List[str]:
 
 @app.get("/api/health")
 def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "query_backend": "duckdb" if _engine is not None else "pandas",
+        "snapshot": (_snapshot_manifest() or {}).get("version"),
+        "startup": request_metrics.startup(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    # Only report render-cache stats once the renderer has been loaded
+    render = sys.modules.get(f"{__package__}.render")
+    cache = render.cache_stats() if render else {"entries": 0, "bytes": 0, "hits": 0, "misses": 0}
+    extra = {
+        "asie_render_cache_entries": cache["entries"],
+        "asie_render_cache_bytes": cache["bytes"],
+        "asie_render_cache_hits_total": cache["hits"],
+        "asie_render_cache_misses_total": cache["misses"],
+        "asie_parquet_cache_entries": _load_parquet.cache_info().currsize,
+        "asie_live_clients": _live.clients if _live else 0,
+    }
+    return PlainTextResponse(request_metrics.render(extra), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/api/meta")
 def meta():
+    manifest = _snapshot_manifest()
+    if _snapshot_file("metrics_state_M.parquet") is not None and "periods" in manifest:
+        return {
+            "periods": manifest["periods"],
+            "latest_period": manifest["latest_period"],
+            "has_district": (DATA_DIR / "metrics_district_M.parquet").exists(),
+            "indices": INDEX_COLUMNS,
+            "frequency": "monthly",
+        }
+    if _engine is not None:
+        return {
+            "periods": _engine.periods("state"),
+            "latest_period": _engine.latest_period("state").strftime("%Y-%m"),
+            "has_district": _engine.has("metrics", "district"),
+            "indices": INDEX_COLUMNS,
+            "frequency": "monthly",
+        }
     state_df = _load_parquet("metrics_state_M.parquet")
     district_df = _load_parquet("metrics_district_M.parquet") if (DATA_DIR / "metrics_district_M.parquet").exists() else None
     return {
@@ -94,6 +230,11 @@ def meta():
 
 @app.get("/api/geo/states")
 def list_states():
+    manifest = _snapshot_manifest()
+    if _snapshot_file("metrics_state_M.parquet") is not None and "states" in manifest:
+        return {"states": manifest["states"]}
+    if _engine is not None:
+        return {"states": _engine.states("state")}
     df = _load_parquet("metrics_state_M.parquet")
     states = sorted(df["state"].dropna().unique().tolist())
     return {"states": states}
@@ -104,6 +245,11 @@ def list_districts(state: str = Query(...)):
     path = DATA_DIR / "metrics_district_M.parquet"
     if not path.exists():
         raise HTTPException(status_code=404, detail="District metrics not available")
+    if _engine is not None:
+        districts = _engine.districts(state)
+        if not districts:
+            raise HTTPException(status_code=404, detail="No matching state")
+        return {"districts": districts}
     df = _load_parquet(path.name)
     df = df[df["state"].str.lower() == state.lower()]
     if df.empty:
@@ -112,22 +258,47 @@ def list_districts(state: str = Query(...)):
     return {"districts": districts}
 
 
-@app.get("/api/state/summary")
-def state_summary(top_n: int = Query(10, le=50)):
-    df_all = _load_parquet("metrics_state_M.parquet")
+def _latest_and_previous(level: str, state: Optional[str] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Rows for the latest period plus each geography's last earlier row."""
+    geo_cols = ["state"] if level == "state" else ["state", "district"]
+    if _engine is not None:
+        return _engine.latest(level, state=state), _engine.previous(level, INDEX_COLUMNS)
+    df_all = _load_parquet(f"metrics_{level}_M.parquet")
     latest = _filter_latest(df_all)
+    if state:
+        latest = latest[latest["state"].str.lower() == state.lower()]
     prev_period = (
         df_all[df_all["period"] < _latest_period(df_all)]
         .sort_values("period")
-        .groupby("state")
+        .groupby(geo_cols)
         .last()
         .reset_index()
     )
-    merged = latest.merge(prev_period[["state", *INDEX_COLUMNS]], on="state", how="left", suffixes=("", "_prev"))
+    return latest, prev_period[[*geo_cols, *INDEX_COLUMNS]]
+
+
+def _with_deltas(latest: pd.DataFrame, prev_period: pd.DataFrame, geo_cols: List[str]) -> pd.DataFrame:
+    merged = latest.merge(prev_period, on=geo_cols, how="left", suffixes=("", "_prev"))
     for metric in INDEX_COLUMNS:
         merged[f"{metric}_delta"] = merged[metric] - merged.get(f"{metric}_prev", 0)
+    return merged
+
+
+def _parse_since(since: Optional[str]) -> Optional[pd.Timestamp]:
+    if not since:
+        return None
+    try:
+        return pd.Period(since).to_timestamp()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid since format; use YYYY-MM")
+
+
+@app.get("/api/state/summary")
+def state_summary(top_n: int = Query(10, le=50)):
+    latest, prev_period = _latest_and_previous("state")
+    merged = _with_deltas(latest, prev_period, ["state"])
     payload = {metric: _top_n(merged, ["state"], metric, n=top_n) for metric in INDEX_COLUMNS}
-    return {"latest_period": _latest_period(df_all).strftime("%Y-%m"), **payload}
+    return {"latest_period": _latest_period(latest).strftime("%Y-%m"), **payload}
 
 
 @app.get("/api/district/summary")
@@ -135,24 +306,10 @@ def district_summary(state: Optional[str] = None, top_n: int = Query(10, le=50))
     path = DATA_DIR / "metrics_district_M.parquet"
     if not path.exists():
         raise HTTPException(status_code=404, detail="District metrics not available")
-    df_all = _load_parquet(path.name)
-    df = _filter_latest(df_all)
-    if state:
-        df = df[df["state"].str.lower() == state.lower()]
+    df, prev_period = _latest_and_previous("district", state=state)
     if df.empty:
         raise HTTPException(status_code=404, detail="No matching districts")
-    prev_period = df_all[df_all["period"] < _latest_period(df_all)]
-    prev_period = (
-        prev_period
-        .sort_values("period")
-        .groupby(["state", "district"])
-        .last()
-        .reset_index()
-    )
-    merged = df.merge(prev_period[["state", "district", *INDEX_COLUMNS]], on=["state", "district"], how="left", suffixes=("", "_prev"))
-    for metric in INDEX_COLUMNS:
-        merged[f"{metric}_delta"] = merged[metric] - merged.get(f"{metric}_prev", 0)
-    df = merged
+    df = _with_deltas(df, prev_period, ["state", "district"])
     payload = {metric: _top_n(df, ["state", "district"], metric, n=top_n) for metric in INDEX_COLUMNS}
     return {"latest_period": _latest_period(df).strftime("%Y-%m"), **payload}
 
@@ -165,67 +322,190 @@ def timeseries(
     metric: str = Query(...),
     since: Optional[str] = None,
 ):
-    file = "metrics_state_M.parquet" if geo_level == "state" else "metrics_district_M.parquet"
-    df = _load_parquet(file)
-    if metric not in df.columns:
-        raise HTTPException(status_code=400, detail="Unknown metric")
-    df = df[df["state"].str.lower() == state.lower()]
-    if geo_level == "district":
-        if not district:
-            raise HTTPException(status_code=400, detail="district is required for district timeseries")
-        df = df[df["district"].str.lower() == district.lower()]
-    if since:
-        try:
-            since_ts = pd.Period(since).to_timestamp()
-            df = df[df["period"] >= since_ts]
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid since format; use YYYY-MM")
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No matching data")
-    df = df.sort_values("period")
+    if geo_level == "district" and not district:
+        raise HTTPException(status_code=400, detail="district is required for district timeseries")
+    since_ts = _parse_since(since)
+    if _engine is not None:
+        if metric not in _engine.columns("metrics", geo_level):
+            raise HTTPException(status_code=400, detail="Unknown metric")
+        df = _engine.series(geo_level, metric, state, district=district, since=since_ts)
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No matching data")
+        periods, values = df["period"], df[metric]
+        fc_sel = _engine.forecast(geo_level, metric, state, district=district)
+        forecast = (fc_sel["period"], fc_sel["forecast"]) if fc_sel is not None and not fc_sel.empty else None
+    else:
+        file = "metrics_state_M.parquet" if geo_level == "state" else "metrics_district_M.parquet"
+        if metric not in _load_parquet(file).columns:
+            raise HTTPException(status_code=400, detail="Unknown metric")
+        # Cached per level: a dict lookup instead of filtering the table and re-reading forecasts
+        index = _series_index(geo_level)
+        geo = (state.lower(),) if geo_level == "state" else (state.lower(), district.lower())
+        found = index.series(geo, metric, since_ts)
+        if found is None or len(found[0]) == 0:
+            raise HTTPException(status_code=404, detail="No matching data")
+        periods, values = pd.Series(found[0]), pd.Series(found[1])
+        fc = index.forecast(geo, metric)
+        forecast = (pd.Series(fc[0]).dt.strftime("%Y-%m"), pd.Series(fc[1])) if fc is not None and len(fc[0]) else None
     resp = {
         "geo_level": geo_level,
         "state": state,
         "district": district,
         "metric": metric,
-        "series": df["period"].dt.strftime("%Y-%m").tolist(),
-        "values": df[metric].round(2).tolist(),
+        "series": periods.dt.strftime("%Y-%m").tolist(),
+        "values": values.round(2).tolist(),
     }
-    forecast_file = "forecast_state.parquet" if geo_level == "state" else "forecast_district.parquet"
-    fc = _load_forecast(forecast_file)
-    if fc is not None:
-        fc_sel = fc[(fc["metric"] == metric) & (fc["state"].str.lower() == state.lower())]
-        if geo_level == "district" and district:
-            fc_sel = fc_sel[fc_sel["district"].str.lower() == district.lower()]
-        if not fc_sel.empty:
-            fc_sel = fc_sel.sort_values("period")
-            resp["forecast_series"] = fc_sel["period"].dt.strftime("%Y-%m").tolist()
-            resp["forecast_values"] = fc_sel["forecast"].tolist()
+    if forecast is not None:
+        resp["forecast_series"] = forecast[0].tolist()
+        resp["forecast_values"] = forecast[1].tolist()
     return resp
 
 
+class GeoRef(BaseModel):
+    level: str = Field("state", pattern="^(state|district)$")
+    state: str
+    district: Optional[str] = None
+
+
+class BatchTimeseriesRequest(BaseModel):
+    geos: List[GeoRef] = Field(..., min_length=1)
+    metrics: List[str] = Field(..., min_length=1)
+    since: Optional[str] = None
+    forecast: bool = True
+
+
+@lru_cache(maxsize=2)
+def _series_index(level: str):
+    from .series import SeriesIndex
+
+    return SeriesIndex(_load_parquet(f"metrics_{level}_M.parquet"), level, _load_forecast(f"forecast_{level}.parquet"))
+
+
+@app.post("/api/timeseries/batch")
+def timeseries_batch(body: BatchTimeseriesRequest):
+    """Every geo x metric series in one call, as a columnar payload on a shared period axis."""
+    from .series import BATCH_MAX_PAIRS, batch_payload, engine_index
+
+    if len(body.geos) * len(body.metrics) > BATCH_MAX_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_PAIRS} geo x metric pairs per request")
+    if any(g.level == "district" and not g.district for g in body.geos):
+        raise HTTPException(status_code=400, detail="district is required for district geos")
+    metrics = list(dict.fromkeys(body.metrics))
+    since_ts = _parse_since(body.since)
+    indexes = {}
+    for level in sorted({g.level for g in body.geos}):
+        if not (DATA_DIR / f"metrics_{level}_M.parquet").exists():
+            raise HTTPException(status_code=404, detail=f"{level.capitalize()} metrics not available")
+        if _engine is not None:
+            numeric = _engine.numeric_columns("metrics", level)
+        else:
+            numeric = _load_parquet(f"metrics_{level}_M.parquet").select_dtypes("number").columns
+        if any(m not in numeric for m in metrics):
+            raise HTTPException(status_code=400, detail="Unknown metric")
+        if _engine is not None:
+            states = sorted({g.state for g in body.geos if g.level == level})
+            indexes[level] = engine_index(_engine, level, metrics, states)
+        else:
+            indexes[level] = _series_index(level)
+    items = [
+        {"level": g.level, "state": g.state, "district": g.district if g.level == "district" else None, "metric": m}
+        for g in body.geos
+        for m in metrics
+    ]
+    return batch_payload(items, indexes, since_ts, body.forecast)
+
+
+# Threshold and joint rule used when scoring a method the pipeline did not store
+LIVE_ANOMALY_THRESHOLD = 2.0
+LIVE_ANOMALY_JOINT_METRICS = 2
+
+
+def _anomaly_engine():
+    # Imported on first use; scoring needs the pandas/numpy stack
+    from asie import anomalies
+
+    return anomalies
+
+
+@lru_cache(maxsize=4)
+def _scored_anomalies(level: str, method: str) -> pd.DataFrame:
+    """Anomalies for a method missing from the stored table, scored from the metrics snapshot."""
+    from .series import GEO_COLS
+
+    engine = _anomaly_engine()
+    geo_cols = GEO_COLS[level]
+    value_cols = ["enrol_total", "demo_total", "bio_total", "tx_load"]
+    if _engine is not None:
+        df = _engine.fetch_df(f"SELECT period, {', '.join(geo_cols + value_cols)} FROM metrics_{level}")
+    else:
+        df = _load_parquet(f"metrics_{level}_M.parquet")
+    params = {}
+    forecast = _load_forecast(f"forecast_{level}.parquet")
+    if method == "forecast_residual" and forecast is not None:
+        params["forecast_residual"] = {"forecast": forecast}
+    return engine.detect_anomalies(
+        df,
+        value_cols=value_cols,
+        group_keys=geo_cols,
+        threshold=LIVE_ANOMALY_THRESHOLD,
+        method=method,
+        params=params,
+        joint_min_metrics=LIVE_ANOMALY_JOINT_METRICS,
+    )
+
+
+def _stored_anomaly_methods(file: str) -> List[str]:
+    """Methods the pipeline scored into ``file``, from the run metadata rather than the rows."""
+    if _snapshot_file(file) is not None:
+        methods = _snapshot_manifest()["tables"][file].get("methods")
+    else:
+        methods = _anomaly_engine().stored_methods(DATA_DIR / file)
+    # Tables written before methods were recorded hold zscore rows only
+    return methods if methods is not None else ["zscore"]
+
+
+def _filter_anomalies(
+    df: pd.DataFrame,
+    metric: Optional[str],
+    state: Optional[str],
+    since_ts: Optional[pd.Timestamp],
+    method: Optional[str],
+    joint: bool,
+) -> pd.DataFrame:
+    if metric:
+        df = df[df["metric"] == metric]
+    if method and "method" in df.columns:
+        df = df[df["method"] == method]
+    df = df[(df["metric"] == "joint") == joint]
+    if state:
+        df = df[df["state"].str.lower() == state.lower()]
+    if since_ts is not None:
+        df = df[df["period"] >= since_ts]
+    return df
+
+
 @app.get("/api/anomalies")
 def anomalies(
     level: str = Query("state", pattern="^(state|district)$"),
     metric: Optional[str] = None,
     since: Optional[str] = None,
     state: Optional[str] = None,
+    method: Optional[str] = Query(None, description="Scoring method; ones not run by the pipeline are scored on demand"),
+    joint: bool = Query(False, description="Return only the cross-metric joint anomalies (left out otherwise)"),
 ):
     file = "anomalies_state_M.parquet" if level == "state" else "anomalies_district_M.parquet"
     path = DATA_DIR / file
     if not path.exists():
         raise HTTPException(status_code=404, detail="Anomalies file not available")
-    df = _load_parquet(path.name)
-    if metric:
-        df = df[df["metric"] == metric]
-    if state:
-        df = df[df["state"].str.lower() == state.lower()]
-    if since:
-        try:
-            since_ts = pd.Period(since).to_timestamp()
-            df = df[df["period"] >= since_ts]
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid since format; use YYYY-MM")
+    since_ts = _parse_since(since)
+    if method is not None and method not in _anomaly_engine().METHODS:
+        raise HTTPException(status_code=400, detail="Unknown anomaly method")
+    if method is not None and method not in _stored_anomaly_methods(file):
+        df = _filter_anomalies(_scored_anomalies(level, method), metric, state, since_ts, None, joint)
+    elif _engine is not None:
+        df = _engine.anomalies(level, metric=metric, state=state, since=since_ts, method=method, joint=joint)
+    else:
+        df = _filter_anomalies(_load_parquet(file), metric, state, since_ts, method, joint)
     if df.empty:
         return {"rows": []}
     def severity(z):
@@ -236,6 +516,7 @@ def anomalies(
             return "Medium"
         return "Low"
 
+    df = df.copy()
     df["severity"] = df["zscore"].apply(severity)
     df = df.sort_values(["period", "metric"], ascending=[False, True])
     df["period"] = df["period"].dt.strftime("%Y-%m")
@@ -243,11 +524,22 @@ def anomalies(
     return {"rows": df[cols].to_dict(orient="records")}
 
 
-@app.get("/api/state/table")
-def state_table(metric: str = Query(...), top_n: int = Query(20, le=100)):
-    df = _filter_latest(_load_parquet("metrics_state_M.parquet"))
+def _latest_for_table(level: str, metric: str, state: Optional[str] = None) -> pd.DataFrame:
+    if _engine is not None:
+        if metric not in _engine.columns("metrics", level):
+            raise HTTPException(status_code=400, detail="Unknown metric")
+        return _engine.latest(level, state=state)
+    df = _filter_latest(_load_parquet(f"metrics_{level}_M.parquet"))
     if metric not in df.columns:
         raise HTTPException(status_code=400, detail="Unknown metric")
+    if state:
+        df = df[df["state"].str.lower() == state.lower()]
+    return df
+
+
+@app.get("/api/state/table")
+def state_table(metric: str = Query(...), top_n: int = Query(20, le=100)):
+    df = _latest_for_table("state", metric)
     return _top_n(df, ["state"], metric, n=top_n)
 
 
@@ -256,16 +548,274 @@ def district_table(metric: str = Query(...), state: Optional[str] = None, top_n:
     path = DATA_DIR / "metrics_district_M.parquet"
     if not path.exists():
         raise HTTPException(status_code=404, detail="District metrics not available")
-    df = _filter_latest(_load_parquet(path.name))
-    if metric not in df.columns:
-        raise HTTPException(status_code=400, detail="Unknown metric")
-    if state:
-        df = df[df["state"].str.lower() == state.lower()]
+    df = _latest_for_table("district", metric, state=state)
     if df.empty:
         raise HTTPException(status_code=404, detail="No matching data")
     return _top_n(df, ["state", "district"], metric, n=top_n)
 
 
+@app.get("/api/query")
+def query(
+    level: str = Query("state", pattern="^(state|district)$"),
+    metric: str = Query(...),
+    agg: str = Query("sum"),
+    group_by: str = Query("period", description="Comma-separated subset of period,state,district"),
+    state: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=QUERY_MAX_ROWS),
+):
+    """Guarded ad-hoc aggregation: whitelisted metrics, aggregates and grouping keys only."""
+    agg = agg.lower()
+    if agg not in QUERY_AGGS:
+        raise HTTPException(status_code=400, detail=f"agg must be one of: {', '.join(sorted(QUERY_AGGS))}")
+    keys = [k.strip() for k in group_by.split(",") if k.strip()]
+    allowed_keys = QUERY_GROUP_COLS if level == "district" else QUERY_GROUP_COLS - {"district"}
+    if any(k not in allowed_keys for k in keys) or len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail=f"group_by must be a subset of: {', '.join(sorted(allowed_keys))}")
+    since_ts = _parse_since(since)
+    until_ts = _parse_since(until)
+    if _engine is not None:
+        numeric = _engine.columns("metrics", level)
+    else:
+        path = DATA_DIR / f"metrics_{level}_M.parquet"
+        if not path.exists():
+            raise HTTPException(status_code=404, detail="Metrics not available")
+        df = _load_parquet(path.name)
+        numeric = df.select_dtypes("number").columns.tolist()
+    if metric not in numeric or metric in QUERY_GROUP_COLS:
+        raise HTTPException(status_code=400, detail="Unknown metric")
+    if _engine is not None:
+        out = _engine.aggregate(level, metric, agg, keys, state=state, since=since_ts, until=until_ts, limit=limit)
+    else:
+        out = aggregate_frame(df, metric, agg, keys, state=state, since=since_ts, until=until_ts, limit=limit)
+    if "period" in out.columns:
+        out["period"] = out["period"].dt.strftime("%Y-%m")
+    out["value"] = out["value"].astype(float).round(4)
+    return {"level": level, "metric": metric, "agg": agg, "group_by": keys, "rows": out.to_dict(orient="records")}
+
+
+def _rollups():
+    # Imported on first use; the module pulls in the metrics/scipy stack
+    from asie import rollups
+
+    return rollups
+
+
+@app.get("/api/rollup")
+def rollup(
+    by: str = Query("period", pattern="^(period|state|period_state)$"),
+    metric: str = Query(...),
+    level: str = Query("district", pattern="^(district|pincode)$"),
+    state: Optional[str] = None,
+    since: Optional[str] = None,
+):
+    """Precomputed sums (volumes) or mean/min/max (indices) of ``metric`` over sub-state rows."""
+    rollups = _rollups()
+    name = rollups.rollup_path(DATA_DIR, level, by).name
+    if not (DATA_DIR / name).exists():
+        raise HTTPException(status_code=404, detail="Rollup not available; run scripts/build_rollups.py")
+    stats = [f"{metric}_sum"] if metric in rollups.COUNT_COLUMNS else [f"{metric}_{s}" for s in ("mean", "min", "max")]
+    df = _load_parquet(name)
+    if any(col not in df.columns for col in stats):
+        raise HTTPException(status_code=400, detail="Unknown metric")
+    since_ts = _parse_since(since)
+    if state and "state" in df.columns:
+        df = df[df["state"].str.lower() == state.lower()]
+    if since_ts is not None and "period" in df.columns:
+        df = df[df["period"] >= since_ts]
+    keys = rollups.ROLLUP_KEYS[by]
+    out = df[[*keys, "geos", *stats]]
+    if "period" in out.columns:
+        out = out.assign(period=out["period"].dt.strftime("%Y-%m"))
+    return {"level": level, "by": by, "metric": metric, "rows": out.to_dict(orient="records")}
+
+
+@lru_cache(maxsize=256)
+def _merged_sketch(level: str, metric: str, period: Optional[str], state: Optional[str]):
+    rollups = _rollups()
+    name = rollups.sketch_path(DATA_DIR, level).name
+    if not (DATA_DIR / name).exists():
+        raise HTTPException(status_code=404, detail="Sketches not available; run scripts/build_rollups.py")
+    if metric not in rollups.SKETCH_MAPPINGS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(rollups.SKETCH_MAPPINGS)}")
+    table = _load_parquet(name)
+    if period == "all":
+        period_ts = None
+    elif period:
+        period_ts = _parse_since(period)
+    else:
+        period_ts = table["period"].max()
+    sketch = rollups.load_sketch(table, metric, period=period_ts, state=state)
+    if sketch.count == 0:
+        raise HTTPException(status_code=404, detail="No matching data")
+    return sketch, ("all" if period_ts is None else period_ts.strftime("%Y-%m"))
+
+
+def _sketch_meta(level: str, metric: str, period_label: str, state: Optional[str], sketch) -> Dict:
+    return {
+        "level": level,
+        "metric": metric,
+        "period": period_label,
+        "state": state,
+        "count": sketch.count,
+        "error_bound": sketch.mapping.error_bound(),
+    }
+
+
+@app.get("/api/quantiles")
+def quantiles(
+    metric: str = Query(...),
+    level: str = Query("district", pattern="^(district|pincode)$"),
+    period: Optional[str] = Query(None, description="YYYY-MM, 'all', or omitted for the latest period"),
+    state: Optional[str] = None,
+    q: str = Query("0.1,0.25,0.5,0.75,0.9"),
+):
+    """Quantiles of ``metric`` across districts from mergeable sketches (no row scan)."""
+    try:
+        qs = [float(x) for x in q.split(",") if x.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="q must be comma-separated numbers")
+    if not qs or len(qs) > 100 or any(not 0 <= x <= 1 for x in qs):
+        raise HTTPException(status_code=400, detail="q must hold 1-100 values in [0, 1]")
+    sketch, period_label = _merged_sketch(level, metric, period, state.lower() if state else None)
+    values = sketch.quantiles(qs)
+    return {
+        **_sketch_meta(level, metric, period_label, state, sketch),
+        "quantiles": [{"q": x, "value": round(float(v), 4)} for x, v in zip(qs, values)],
+    }
+
+
+@app.get("/api/distribution")
+def distribution(
+    metric: str = Query(...),
+    level: str = Query("district", pattern="^(district|pincode)$"),
+    period: Optional[str] = Query(None, description="YYYY-MM, 'all', or omitted for the latest period"),
+    state: Optional[str] = None,
+    bins: int = Query(20, ge=1, le=200),
+):
+    """Histogram of ``metric`` across districts from mergeable sketches (no row scan)."""
+    sketch, period_label = _merged_sketch(level, metric, period, state.lower() if state else None)
+    edges, counts = sketch.histogram(bins)
+    return {
+        **_sketch_meta(level, metric, period_label, state, sketch),
+        "edges": [round(float(e), 4) for e in edges],
+        "counts": counts.tolist(),
+    }
+
+
+@app.get("/api/chart")
+async def chart(
+    kind: str = Query("top", pattern="^(top|timeseries)$"),
+    metric: str = Query(...),
+    level: str = Query("state", pattern="^(state|district)$"),
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    period: Optional[str] = None,
+    top_n: int = Query(10, ge=1, le=50),
+    fmt: str = Query("png", pattern="^(png|svg)$"),
+    dpi: int = Query(100, ge=50, le=300),
+):
+    """Render a top-N bar chart or a timeseries-with-forecast plot on request."""
+    # matplotlib/seaborn are only imported once a chart is actually requested
+    from asie.charts import ChartSpec
+
+    from . import render
+
+    if kind == "timeseries" and not state:
+        raise HTTPException(status_code=400, detail="state is required for timeseries charts")
+    if kind == "timeseries" and level == "district" and not district:
+        raise HTTPException(status_code=400, detail="district is required for district timeseries")
+    if period:
+        _parse_since(period)
+    path = DATA_DIR / f"metrics_{level}_M.parquet"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"{level.capitalize()} metrics not available")
+    df = await run_in_threadpool(_load_parquet, path.name)
+    if metric not in df.select_dtypes("number").columns:
+        raise HTTPException(status_code=400, detail="Unknown metric")
+    spec = ChartSpec(kind, metric, level=level, state=state, district=district, period=period, n=top_n)
+    forecast = None
+    if kind == "timeseries":
+        forecast = await run_in_threadpool(_load_forecast, f"forecast_{level}.parquet")
+    key, data = await run_in_threadpool(render.prepare, df, spec, fmt, dpi, forecast)
+    if data.empty:
+        raise HTTPException(status_code=404, detail="No matching data")
+    payload, hit = await render.render(key, data, spec, fmt, dpi)
+    return Response(
+        content=payload,
+        media_type=render.MEDIA_TYPES[fmt],
+        headers={"ETag": f'"{key}"', "Cache-Control": "public, max-age=300", "X-Render-Cache": "hit" if hit else "miss"},
+    )
+
+
+def _require_live() -> LiveHub:
+    if _live is None or _snapshot_manifest() is None:
+        raise HTTPException(status_code=404, detail="Live updates need a published snapshot (ASIE_SNAPSHOT)")
+    return _live
+
+
+@app.get("/api/updates")
+def updates(since: Optional[str] = None):
+    """Diffs published after snapshot version ``since``; ``reset`` means re-fetch everything."""
+    _require_live()
+    manifest = _snapshot_manifest()
+    version = manifest["version"]
+    if since == version:
+        return {"version": version, "reset": False, "diffs": []}
+    chain = snapshot.diffs_since(_snapshot.root, since, version) if since else None
+    if chain is None:
+        return {"version": version, "reset": True, "diffs": []}
+    return {"version": version, "reset": False, "diffs": [with_routes(diff) for diff in chain]}
+
+
+@app.get("/api/stream")
+async def stream(last_event_id: Optional[str] = Header(None)):
+    """Server-sent events: ``hello`` on connect, then one ``diff`` per published snapshot version."""
+    hub = _require_live()
+    return StreamingResponse(
+        hub.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.on_event("startup")
+def _log_startup():
+    request_metrics.mark_ready()
+    logger.info("ASIE API ready in %.3fs (snapshot: %s)", request_metrics.startup()["ready_seconds"], _snapshot.version if _snapshot else None)
+    if WARM_ON_STARTUP:
+        threading.Thread(target=_warm, name="asie-warm", daemon=True).start()
+
+
+def _warm():
+    if _engine is not None:
+        # DuckDB scans the parquet files per query; caching frames here would only duplicate them
+        _snapshot_manifest()
+        for level in ["state", "district"]:
+            if _engine.has("metrics", level):
+                try:
+                    _engine.latest_period(level)
+                except Exception:
+                    logger.exception("Warm-up query failed for metrics_%s", level)
+        return
+    for name in ["metrics_state_M.parquet", "metrics_district_M.parquet"]:
+        if (DATA_DIR / name).exists():
+            try:
+                _load_parquet(name)
+            except Exception:
+                logger.exception("Warm-up load failed for %s", name)
+
+
+@app.on_event("shutdown")
+def _shutdown_background_work():
+    if _live is not None:
+        _live.stop()
+    render = sys.modules.get(f"{__package__}.render")
+    if render is not None:
+        render.shutdown()
+
+
 # Entry point helper for uvicorn
 
 def create_app():
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:  # pandas loads lazily in the API process
+    import pandas as pd
+
+
+def _import_duckdb():
+    # Optional embedded columnar backend, imported only when selected
+    try:
+        import duckdb
+    except ImportError:  # pragma: no cover - depends on deployment extras
+        return None
+    return duckdb
+
+# Views exposed to SQL, keyed by (kind, level)
+VIEW_FILES = {
+    ("metrics", "state"): "metrics_state_M.parquet",
+    ("metrics", "district"): "metrics_district_M.parquet",
+    ("anomalies", "state"): "anomalies_state_M.parquet",
+    ("anomalies", "district"): "anomalies_district_M.parquet",
+    ("forecast", "state"): "forecast_state.parquet",
+    ("forecast", "district"): "forecast_district.parquet",
+}
+
+GEO_COLS = {"state": ["state"], "district": ["state", "district"]}
+
+# Whitelist for the ad-hoc /api/query endpoint
+QUERY_AGGS = {"sum", "avg", "min", "max", "median", "count"}
+QUERY_GROUP_COLS = {"period", "state", "district"}
+QUERY_MAX_ROWS = 1000
+
+
+# DESCRIBE type names of the columns exposed as numeric metrics
+NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "DECIMAL",
+)
+
+
+def _view_name(kind: str, level: str) -> str:
+    return f"{kind}_{level}"
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class DuckDBEngine:
+    """Parameterized queries over the processed parquet files via DuckDB.
+
+    Parquet files are scanned lazily per query, so memory stays flat as the
+    district and pincode datasets grow instead of caching every frame.
+    """
+
+    def __init__(self, data_dir: Path):
+        duckdb = _import_duckdb()
+        if duckdb is None:
+            raise RuntimeError("duckdb is not installed; pip install duckdb")
+        self.data_dir = Path(data_dir)
+        self._con = duckdb.connect(database=":memory:")
+        self._local = threading.local()
+        self.views: Dict[str, List[str]] = {}
+        self.numeric: Dict[str, List[str]] = {}
+        for (kind, level), name in VIEW_FILES.items():
+            path = self.data_dir / name
+            if not path.exists():
+                continue
+            view = _view_name(kind, level)
+            self._con.execute(
+                f"CREATE OR REPLACE VIEW {view} AS SELECT * FROM read_parquet({_quote_literal(str(path))})"
+            )
+            described = self._con.execute(f"DESCRIBE {view}").fetchall()
+            self.views[view] = [row[0] for row in described]
+            self.numeric[view] = [row[0] for row in described if row[1].startswith(NUMERIC_TYPES)]
+
+    def _cursor(self):
+        # DuckDB connections are not thread-safe; FastAPI runs sync handlers in a pool
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._con.cursor()
+            self._local.cursor = cur
+        return cur
+
+    def has(self, kind: str, level: str) -> bool:
+        return _view_name(kind, level) in self.views
+
+    def columns(self, kind: str, level: str) -> List[str]:
+        return self.views.get(_view_name(kind, level), [])
+
+    def numeric_columns(self, kind: str, level: str) -> List[str]:
+        """Columns of the view with a numeric type, matching pandas ``select_dtypes("number")``."""
+        return self.numeric.get(_view_name(kind, level), [])
+
+    def fetch_df(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        return self._cursor().execute(sql, list(params)).fetchdf()
+
+    def latest_period(self, level: str) -> pd.Timestamp:
+        import pandas as pd
+
+        view = _view_name("metrics", level)
+        return pd.Timestamp(self._cursor().execute(f"SELECT max(period) FROM {view}").fetchone()[0])
+
+    def periods(self, level: str) -> List[str]:
+        view = _view_name("metrics", level)
+        rows = self._cursor().execute(
+            f"SELECT DISTINCT strftime(period, '%Y-%m') AS p FROM {view} ORDER BY p"
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def states(self, level: str = "state") -> List[str]:
+        view = _view_name("metrics", level)
+        rows = self._cursor().execute(
+            f"SELECT DISTINCT state FROM {view} WHERE state IS NOT NULL ORDER BY state"
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def districts(self, state: str) -> List[str]:
+        rows = self._cursor().execute(
+            "SELECT DISTINCT district FROM metrics_district "
+            "WHERE lower(state) = lower(?) AND district IS NOT NULL ORDER BY district",
+            [state],
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def latest(self, level: str, state: Optional[str] = None) -> pd.DataFrame:
+        view = _view_name("metrics", level)
+        sql = f"SELECT * FROM {view} WHERE period = (SELECT max(period) FROM {view})"
+        params: List[Any] = []
+        if state:
+            sql += " AND lower(state) = lower(?)"
+            params.append(state)
+        return self.fetch_df(sql, params)
+
+    def previous(self, level: str, columns: Sequence[str]) -> pd.DataFrame:
+        """Last row per geography strictly before the latest period."""
+        view = _view_name("metrics", level)
+        geo = ", ".join(GEO_COLS[level])
+        cols = ", ".join(columns)
+        sql = (
+            f"SELECT {geo}, {cols} FROM {view} "
+            f"WHERE period < (SELECT max(period) FROM {view}) "
+            f"QUALIFY row_number() OVER (PARTITION BY {geo} ORDER BY period DESC) = 1"
+        )
+        return self.fetch_df(sql)
+
+    def series(
+        self,
+        level: str,
+        metric: str,
+        state: str,
+        district: Optional[str] = None,
+        since: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        view = _view_name("metrics", level)
+        sql = f"SELECT period, {metric} FROM {view} WHERE lower(state) = lower(?)"
+        params: List[Any] = [state]
+        if level == "district":
+            sql += " AND lower(district) = lower(?)"
+            params.append(district)
+        if since is not None:
+            sql += " AND period >= ?"
+            params.append(since.to_pydatetime())
+        return self.fetch_df(sql + " ORDER BY period", params)
+
+    def forecast(self, level: str, metric: str, state: str, district: Optional[str] = None) -> Optional[pd.DataFrame]:
+        if not self.has("forecast", level):
+            return None
+        # Forecast periods are stored as pandas Period[M] ordinals (months since 1970-01)
+        sql = (
+            f"SELECT strftime(DATE '1970-01-01' + to_months(CAST(period AS INTEGER)), '%Y-%m') AS period, forecast "
+            f"FROM {_view_name('forecast', level)} WHERE metric = ? AND lower(state) = lower(?)"
+        )
+        params: List[Any] = [metric, state]
+        if level == "district" and district:
+            sql += " AND lower(district) = lower(?)"
+            params.append(district)
+        return self.fetch_df(sql + " ORDER BY 1", params)
+
+    def anomalies(
+        self,
+        level: str,
+        metric: Optional[str] = None,
+        state: Optional[str] = None,
+        since: Optional[pd.Timestamp] = None,
+        method: Optional[str] = None,
+        joint: bool = False,
+    ) -> pd.DataFrame:
+        sql = f"SELECT * FROM {_view_name('anomalies', level)} WHERE TRUE"
+        params: List[Any] = []
+        if metric:
+            sql += " AND CAST(metric AS VARCHAR) = ?"
+            params.append(metric)
+        if method and "method" in self.columns("anomalies", level):
+            sql += " AND CAST(method AS VARCHAR) = ?"
+            params.append(method)
+        sql += " AND CAST(metric AS VARCHAR) " + ("= 'joint'" if joint else "<> 'joint'")
+        if state:
+            sql += " AND lower(state) = lower(?)"
+            params.append(state)
+        if since is not None:
+            sql += " AND period >= ?"
+            params.append(since.to_pydatetime())
+        return self.fetch_df(sql, params)
+
+    def aggregate(
+        self,
+        level: str,
+        metric: str,
+        agg: str,
+        group_by: Sequence[str],
+        state: Optional[str] = None,
+        since: Optional[pd.Timestamp] = None,
+        until: Optional[pd.Timestamp] = None,
+        limit: int = 100,
+    ) -> pd.DataFrame:
+        view = _view_name("metrics", level)
+        select = [*group_by, f"{agg}({metric}) AS value"]
+        sql = f"SELECT {', '.join(select)} FROM {view} WHERE TRUE"
+        params: List[Any] = []
+        if state:
+            sql += " AND lower(state) = lower(?)"
+            params.append(state)
+        if since is not None:
+            sql += " AND period >= ?"
+            params.append(since.to_pydatetime())
+        if until is not None:
+            sql += " AND period <= ?"
+            params.append(until.to_pydatetime())
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+        sql += " LIMIT ?"
+        params.append(int(limit))
+        return self.fetch_df(sql, params)
+
+
+def aggregate_frame(
+    df: pd.DataFrame,
+    metric: str,
+    agg: str,
+    group_by: Sequence[str],
+    state: Optional[str] = None,
+    since: Optional[pd.Timestamp] = None,
+    until: Optional[pd.Timestamp] = None,
+    limit: int = 100,
+) -> pd.DataFrame:
+    """Pandas equivalent of ``DuckDBEngine.aggregate`` for the in-memory backend."""
+    import pandas as pd
+
+    if state:
+        df = df[df["state"].str.lower() == state.lower()]
+    if since is not None:
+        df = df[df["period"] >= since]
+    if until is not None:
+        df = df[df["period"] <= until]
+    func = "mean" if agg == "avg" else agg
+    if group_by:
+        out = df.groupby(list(group_by))[metric].agg(func).rename("value").reset_index()
+        out = out.sort_values(list(group_by))
+    else:
+        out = pd.DataFrame({"value": [df[metric].agg(func)]})
+    return out.head(limit)
+
+
+def create_engine(backend: str, data_dir: Path) -> Optional[DuckDBEngine]:
+    """Return a SQL engine for ``backend`` or ``None`` for the pandas path."""
+    backend = (backend or "pandas").lower()
+    if backend == "pandas":
+        return None
+    if backend == "duckdb":
+        return DuckDBEngine(data_dir)
+    if backend == "auto":
+        return DuckDBEngine(data_dir) if _import_duckdb() is not None else None
+    raise ValueError("ASIE_QUERY_BACKEND must be one of: pandas, duckdb, auto")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from asie.charts import ChartSpec, render_chart, select_slice, slice_hash
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Byte budget for rendered charts kept in memory and size of the render pool
+RENDER_CACHE_BYTES = int(os.environ.get("ASIE_RENDER_CACHE_MB", "64")) * 1024 * 1024
+RENDER_WORKERS = int(os.environ.get("ASIE_RENDER_WORKERS", "2"))
+
+
+class RenderCache:
+    """Content-addressed LRU of rendered chart bytes, bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+_cache = RenderCache(RENDER_CACHE_BYTES)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Concurrent cold renders of the same chart share one future
+_inflight: dict = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+def prepare(
+    df: pd.DataFrame, spec: ChartSpec, fmt: str, dpi: int, forecast: Optional[pd.DataFrame] = None
+) -> Tuple[str, pd.DataFrame]:
+    """Slice the data and derive the content address for ``(slice, spec, fmt, dpi)``."""
+    data = select_slice(df, spec, forecast=forecast)
+    return f"{slice_hash(data, spec)}.{dpi}.{fmt}", data
+
+
+async def render(key: str, data: pd.DataFrame, spec: ChartSpec, fmt: str, dpi: int) -> Tuple[bytes, bool]:
+    """Return ``(payload, cache_hit)``; cold renders run in the process pool."""
+    payload = _cache.get(key)
+    if payload is not None:
+        return payload, True
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(_get_pool(), render_chart, data, spec, fmt, dpi)
+        _inflight[key] = future
+        future.add_done_callback(lambda done: _finish(key, done))
+    # A cancelled request must not cancel the render other requests are waiting on
+    return await asyncio.shield(future), False
+
+
+def _finish(key: str, future: asyncio.Future) -> None:
+    # Runs once per render whichever awaiter (if any) is still around
+    _inflight.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _cache.put(key, future.result())
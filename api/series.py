@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .query import DuckDBEngine
+
+GEO_COLS = {"state": ["state"], "district": ["state", "district"]}
+# Upper bound on geos x metrics per batch request
+BATCH_MAX_PAIRS = 500
+
+
+def _lowered(df: pd.DataFrame, cols: Sequence[str]) -> List[np.ndarray]:
+    return [df[c].astype("string").str.lower().fillna("").to_numpy(dtype=object) for c in cols]
+
+
+def _ranges(keys: List[np.ndarray]) -> Dict[Tuple, Tuple[int, int]]:
+    """(start, stop) of each run of equal key tuples in already-sorted key arrays."""
+    n = len(keys[0]) if keys else 0
+    if n == 0:
+        return {}
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for arr in keys:
+        change[1:] |= arr[1:] != arr[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], n)
+    return {tuple(arr[s] for arr in keys): (int(s), int(e)) for s, e in zip(starts, stops)}
+
+
+class SeriesIndex:
+    """Contiguous row ranges per geography in period-sorted metrics/forecast frames.
+
+    Rows are ordered once by (lower-cased geography, period), and forecasts
+    by (geography, metric, period), so each series lookup is a dict hit plus
+    an array slice rather than a boolean filter over the whole table. Metric
+    columns are materialized in that order on first use only, leaving the
+    source frames (e.g. snapshot views) untouched.
+    """
+
+    def __init__(self, df: pd.DataFrame, level: str, forecast: Optional[pd.DataFrame] = None):
+        geo_cols = GEO_COLS[level]
+        self.level = level
+        self.source = df
+        keys = _lowered(df, geo_cols)
+        order = np.lexsort((df["period"].to_numpy(), *reversed(keys)))
+        self.order = order
+        self.periods = df["period"].to_numpy()[order]
+        self.ranges = _ranges([k[order] for k in keys])
+        self._columns: Dict[str, np.ndarray] = {}
+
+        self.forecast_ranges: Dict[Tuple, Tuple[int, int]] = {}
+        if forecast is not None and not forecast.empty:
+            fkeys = [*_lowered(forecast, geo_cols), forecast["metric"].to_numpy(dtype=object)]
+            forder = np.lexsort((forecast["period"].to_numpy(), *reversed(fkeys)))
+            self.forecast_periods = forecast["period"].to_numpy()[forder]
+            self.forecast_values = forecast["forecast"].to_numpy(dtype=float)[forder]
+            self.forecast_ranges = _ranges([k[forder] for k in fkeys])
+
+    def column(self, metric: str) -> np.ndarray:
+        values = self._columns.get(metric)
+        if values is None:
+            values = self.source[metric].to_numpy(dtype=float)[self.order]
+            self._columns[metric] = values
+        return values
+
+    def series(self, geo: Tuple[str, ...], metric: str, since: Optional[pd.Timestamp] = None):
+        span = self.ranges.get(geo)
+        if span is None:
+            return None
+        start, stop = span
+        periods = self.periods[start:stop]
+        if since is not None:
+            start += int(np.searchsorted(periods, np.datetime64(since), side="left"))
+        return self.periods[start:stop], self.column(metric)[start:stop]
+
+    def forecast(self, geo: Tuple[str, ...], metric: str):
+        span = self.forecast_ranges.get((*geo, metric))
+        if span is None:
+            return None
+        start, stop = span
+        return self.forecast_periods[start:stop], self.forecast_values[start:stop]
+
+
+def engine_index(engine: DuckDBEngine, level: str, metrics: Sequence[str], states: Sequence[str]) -> SeriesIndex:
+    """SeriesIndex over just the requested states and metrics, fetched in one query per table."""
+    geo = ", ".join(GEO_COLS[level])
+    marks = ", ".join("?" for _ in states)
+    lowered = [s.lower() for s in states]
+    # Counts are integer columns; cast so values come back as floats like the pandas index
+    values = ", ".join(f"CAST({m} AS DOUBLE) AS {m}" for m in metrics)
+    df = engine.fetch_df(f"SELECT period, {geo}, {values} FROM metrics_{level} WHERE lower(state) IN ({marks})", lowered)
+    forecast = None
+    if engine.has("forecast", level):
+        metric_marks = ", ".join("?" for _ in metrics)
+        # Forecast periods are stored as pandas Period[M] ordinals (months since 1970-01)
+        forecast = engine.fetch_df(
+            f"SELECT {geo}, metric, CAST(DATE '1970-01-01' + to_months(CAST(period AS INTEGER)) AS TIMESTAMP) AS period, "
+            f"forecast FROM forecast_{level} WHERE metric IN ({metric_marks}) AND lower(state) IN ({marks})",
+            [*metrics, *lowered],
+        )
+    return SeriesIndex(df, level, forecast)
+
+
+def _aligned(axis: np.ndarray, periods: np.ndarray, values: np.ndarray, decimals: Optional[int]) -> List[Any]:
+    out = np.full(len(axis), np.nan)
+    out[np.searchsorted(axis, periods)] = values if decimals is None else np.round(values, decimals)
+    return [None if np.isnan(v) else float(v) for v in out]
+
+
+def batch_payload(
+    items: List[Dict[str, Any]], indexes: Dict[str, SeriesIndex], since: Optional[pd.Timestamp], with_forecast: bool
+) -> Dict[str, Any]:
+    """Columnar payload: one shared period axis, one aligned values/forecast array per item.
+
+    ``items`` carry ``level``, ``state``, ``district`` and ``metric``; items
+    with no data are reported under ``errors`` by position instead of failing
+    the whole batch.
+    """
+    found = []
+    errors = []
+    for pos, item in enumerate(items):
+        index = indexes[item["level"]]
+        geo = tuple(v.lower() for v in [item["state"], item.get("district")][: len(GEO_COLS[item["level"]])])
+        actual = index.series(geo, item["metric"], since)
+        if actual is None or len(actual[0]) == 0:
+            errors.append({"index": pos, "detail": "No matching data"})
+            continue
+        fc = index.forecast(geo, item["metric"]) if with_forecast else None
+        found.append((item, actual, fc))
+
+    axis_parts = [actual[0] for _, actual, _ in found] + [fc[0] for _, _, fc in found if fc is not None]
+    axis = np.unique(np.concatenate(axis_parts)) if axis_parts else np.array([], dtype="datetime64[ns]")
+    series = []
+    for item, (periods, values), fc in found:
+        entry = {**item, "values": _aligned(axis, periods, values, 2), "last_actual": pd.Timestamp(periods[-1]).strftime("%Y-%m")}
+        if fc is not None and len(fc[0]):
+            entry["forecast"] = _aligned(axis, fc[0], fc[1], None)
+        series.append(entry)
+    return {
+        "periods": pd.DatetimeIndex(axis).strftime("%Y-%m").tolist(),
+        "series": series,
+        "errors": errors,
+    }
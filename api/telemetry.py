@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+# Latency buckets in seconds (Prometheus-style cumulative histogram)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Request counters and latency histograms keyed by (method, route, status)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, origin: Optional[float] = None):
+        self.buckets = buckets
+        # perf_counter() reference for start-up timings (when the app module began importing)
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.first_byte_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._hist: Dict[Tuple[str, str], List[int]] = {}
+        self._sums: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._in_flight = 0
+        self.started = time.time()
+
+    def begin(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def mark_ready(self) -> None:
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+
+    def startup(self) -> Dict[str, Optional[float]]:
+        """Seconds from app import to readiness and to the first completed response."""
+
+        def _since(ts: Optional[float]) -> Optional[float]:
+            return None if ts is None else round(ts - self.origin, 4)
+
+        return {"ready_seconds": _since(self.ready_at), "time_to_first_byte_seconds": _since(self.first_byte_at)}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            if self.first_byte_at is None:
+                self.first_byte_at = time.perf_counter()
+            self._in_flight -= 1
+            self._counts[(method, route, str(status))] += 1
+            hist = self._hist.setdefault(key, [0] * (len(self.buckets) + 1))
+            hist[idx] += 1
+            self._sums[key] += seconds
+
+    def render(self, extra: Dict[str, float] | None = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            "# HELP asie_http_requests_total HTTP requests by method, route and status.",
+            "# TYPE asie_http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status), count in sorted(self._counts.items()):
+                lines.append(f'asie_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines += [
+                "# HELP asie_http_request_duration_seconds Request latency by method and route.",
+                "# TYPE asie_http_request_duration_seconds histogram",
+            ]
+            for (method, route), hist in sorted(self._hist.items()):
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, hist):
+                    cumulative += count
+                    lines.append(f'asie_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += hist[-1]
+                lines.append(f'asie_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"asie_http_request_duration_seconds_sum{{{labels}}} {self._sums[(method, route)]:.6f}")
+                lines.append(f"asie_http_request_duration_seconds_count{{{labels}}} {cumulative}")
+            lines += [
+                "# HELP asie_http_requests_in_flight Requests currently being served.",
+                "# TYPE asie_http_requests_in_flight gauge",
+                f"asie_http_requests_in_flight {self._in_flight}",
+            ]
+        for name, value in self.startup().items():
+            if value is not None:
+                lines += [f"# TYPE asie_startup_{name} gauge", f"asie_startup_{name} {value}"]
+        lines += [
+            "# HELP asie_process_uptime_seconds Seconds since the API process started.",
+            "# TYPE asie_process_uptime_seconds gauge",
+            f"asie_process_uptime_seconds {time.time() - self.started:.3f}",
+        ]
+        for name, value in (extra or {}).items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class TimingMiddleware(BaseHTTPMiddleware):
+    """Time every request and add ``Server-Timing`` / histogram observations."""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        super().__init__(app)
+        self.metrics = metrics
+
+    async def dispatch(self, request: Request, call_next):
+        self.metrics.begin()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            elapsed = time.perf_counter() - start
+            # Label by route template (e.g. /api/timeseries) to keep cardinality bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", None) or ("/charts" if request.url.path.startswith("/charts") else "unmatched")
+            self.metrics.observe(request.method, path, status, elapsed)
+        response.headers["Server-Timing"] = f"app;dur={elapsed * 1000:.1f}"
+        return response
@@ -0,0 +1,28 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+from asie.rollups import write_rollups
+from asie.snapshot import write_snapshot
+
+PROCESSED_DIR = ROOT / "data" / "processed"
+
+
+def main():
+    for level in ["district", "pincode"]:
+        path = PROCESSED_DIR / f"metrics_{level}_M.parquet"
+        if not path.exists():
+            continue
+        for out in write_rollups(pd.read_parquet(path), PROCESSED_DIR, level):
+            print(f"Wrote {out}")
+    print(f"Serving snapshot written to {write_snapshot(PROCESSED_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
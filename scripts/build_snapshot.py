@@ -0,0 +1,13 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+from asie.snapshot import write_snapshot
+
+if __name__ == "__main__":
+    out = write_snapshot(ROOT / "data" / "processed")
+    print(f"Serving snapshot written to {out}")
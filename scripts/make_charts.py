@@ -1,71 +1,77 @@
 from pathlib import Path
+import argparse
 import sys
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.append(str(SRC))
 
+from asie.charts import INDEX_COLUMNS, family_specs, render_family
+from asie.profiling import add_profile_args, run_maybe_profiled
+
 PLOTS_DIR = ROOT / "reports" / "plots"
-PLOTS_DIR.mkdir(parents=True, exist_ok=True)
+PROCESSED_DIR = ROOT / "data" / "processed"
+
 
+def load_frames():
+    frames = {}
+    for level in ["state", "district"]:
+        path = PROCESSED_DIR / f"metrics_{level}_M.parquet"
+        if path.exists():
+            frames[level] = pd.read_parquet(path)
+    return frames
 
-def load_latest(metrics_path: Path, geo_cols):
-    df = pd.read_parquet(metrics_path)
-    latest = df[df["period"] == df["period"].max()].copy()
-    return latest[geo_cols + [
-        "digital_inclusion_index",
-        "migration_intensity_score",
-        "service_stress_index",
-        "data_quality_friction_index",
-        "biometric_failure_risk_score",
-    ]]
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render ASIE charts into reports/plots (served at /charts).")
+    parser.add_argument("--family", choices=["latest", "period", "state", "district"], default="latest")
+    parser.add_argument("--state", help="Restrict state/district families to one state")
+    parser.add_argument("--district", help="Restrict the district family to one district")
+    parser.add_argument("--period", help="YYYY-MM for the period family (or to pin the state family)")
+    parser.add_argument("--metric", action="append", choices=INDEX_COLUMNS, help="Repeatable; defaults to all indices")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render even when the input slice is unchanged")
+    parser.add_argument("--max-cache-mb", type=float, default=200.0, help="Size cap for on-demand chart families")
+    add_profile_args(parser)
+    return parser.parse_args(argv)
 
-def plot_top(df, geo_cols, metric, n=10, title=""):
-    cols = geo_cols + [metric]
-    top = df[cols].sort_values(metric, ascending=False).head(n)
-    label_col = geo_cols[-1]
-    plt.figure(figsize=(10, 6))
-    sns.barplot(y=label_col, x=metric, data=top, palette="viridis")
-    plt.title(title or f"Top {n} by {metric}")
-    plt.tight_layout()
-    outfile = PLOTS_DIR / f"top_{metric}_{label_col}.png"
-    plt.savefig(outfile, dpi=200)
-    plt.close()
-    return outfile
 
+def main(argv=None):
+    args = parse_args(argv)
+    run_maybe_profiled(lambda: render(args), args)
 
-def main():
-    # State-level
-    state_metrics = ROOT / "data" / "processed" / "metrics_state_M.parquet"
-    if state_metrics.exists():
-        df_state = load_latest(state_metrics, ["state"])
-        for metric in [
-            "digital_inclusion_index",
-            "migration_intensity_score",
-            "service_stress_index",
-            "data_quality_friction_index",
-            "biometric_failure_risk_score",
-        ]:
-            plot_top(df_state, ["state"], metric, n=10, title=f"State: Top 10 {metric}")
 
-    # District-level
-    district_metrics = ROOT / "data" / "processed" / "metrics_district_M.parquet"
-    if district_metrics.exists():
-        df_district = load_latest(district_metrics, ["state", "district"])
-        for metric in [
-            "digital_inclusion_index",
-            "migration_intensity_score",
-            "service_stress_index",
-            "data_quality_friction_index",
-            "biometric_failure_risk_score",
-        ]:
-            plot_top(df_district, ["state", "district"], metric, n=10, title=f"District: Top 10 {metric}")
+def render(args):
+    frames = load_frames()
+    if not frames:
+        print(f"No metrics parquet found in {PROCESSED_DIR}")
+        return
+    specs = family_specs(
+        args.family,
+        frames,
+        state=args.state,
+        district=args.district,
+        period=args.period,
+        metrics=args.metric or INDEX_COLUMNS,
+        n=args.top,
+    )
+    result = render_family(
+        PLOTS_DIR,
+        frames,
+        specs,
+        family=args.family,
+        workers=args.workers,
+        force=args.force,
+        max_cache_bytes=int(args.max_cache_mb * 1024 * 1024),
+    )
+    print(
+        f"{args.family}: rendered {len(result['rendered'])}, "
+        f"unchanged {len(result['skipped'])}, evicted {len(result['evicted'])}"
+    )
 
 
 if __name__ == "__main__":
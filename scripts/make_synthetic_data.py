@@ -0,0 +1,28 @@
+from pathlib import Path
+import argparse
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+from asie.synthetic import SCALES, generate_raw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write seeded synthetic Aadhaar raw CSVs (enrolment/demographic/biometric).")
+    parser.add_argument("--out", type=Path, default=ROOT / "data" / "synthetic" / "raw")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, help="Override the preset's number of days")
+    parser.add_argument("--rows-per-file", type=int, default=500_000)
+    args = parser.parse_args(argv)
+    overrides = {"days": args.days} if args.days else {}
+    rows = generate_raw(args.out, scale=args.scale, seed=args.seed, rows_per_file=args.rows_per_file, **overrides)
+    counts = ", ".join(f"{name} {n:,}" for name, n in rows.items())
+    print(f"Wrote {sum(rows.values()):,} rows ({counts}) under {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.append(str(SRC))
+
+import pandas as pd
+
+from asie import anomalies, data_loader, forecast, metrics
+from asie.pipeline import run_pipeline
+from asie.synthetic import SCALES, generate_raw
+
+BASELINES = ROOT / "benchmarks" / "baselines.json"
+WORK_DIR = ROOT / "benchmarks" / ".work"
+
+API_ENDPOINTS = [
+    "/api/meta",
+    "/api/state/summary",
+    "/api/district/summary",
+    "/api/timeseries?geo_level=district&state=State%2001&district=District%2001-01&metric=tx_load",
+    "/api/anomalies?level=district",
+    "/api/district/table?metric=service_stress_index",
+]
+
+
+def _time(func, repeat):
+    """Median wall time of ``func`` over ``repeat`` runs, plus the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def bench_stages(raw_root, processed_root, geo_level, repeat):
+    timings = {}
+    geo_cols = data_loader._geo_cols_for_level(geo_level)
+
+    timings["aggregate_csv_dir"], loaded = _time(
+        lambda: (
+            data_loader.load_enrolment(raw_root, geo_level=geo_level),
+            data_loader.load_demographic(raw_root, geo_level=geo_level),
+            data_loader.load_biometric(raw_root, geo_level=geo_level),
+        ),
+        repeat,
+    )
+    enrol, demo, bio = loaded
+    timings["compute_indices"], combined = _time(lambda: metrics.compute_indices(enrol, demo, bio), repeat)
+    timings["detect_anomalies"], _ = _time(
+        lambda: anomalies.detect_anomalies(
+            combined, value_cols=["enrol_total", "demo_total", "bio_total", "tx_load"], group_keys=geo_cols, threshold=2.0
+        ),
+        repeat,
+    )
+    timings["forecast_metrics"], _ = _time(
+        lambda: forecast.forecast_metrics(combined, geo_cols=geo_cols, metrics=["tx_load", *metrics.DEFAULT_INDEX_WEIGHTS]),
+        repeat,
+    )
+    return {f"{geo_level}.{k}": v for k, v in timings.items()}
+
+
+def bench_api(processed_root, repeat):
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError):  # TestClient needs httpx
+        print("Skipping API benchmarks: install httpx to enable fastapi.testclient")
+        return {}
+    os.environ["ASIE_DATA_DIR"] = str(processed_root)
+    sys.path.insert(0, str(ROOT))
+    import api.main as api_main
+
+    timings = {}
+    with TestClient(api_main.app) as client:
+        for url in API_ENDPOINTS:
+            api_main._load_parquet.cache_clear()
+            cold, resp = _time(lambda: client.get(url), 1)
+            if resp.status_code != 200:
+                raise RuntimeError(f"{url} returned {resp.status_code}: {resp.text[:200]}")
+            warm, _ = _time(lambda: client.get(url), repeat)
+            name = url.split("?")[0]
+            timings[f"api.cold{name}"] = cold
+            timings[f"api.warm{name}"] = warm
+    return timings
+
+
+def code_revision() -> str:
+    """Hash of the library sources, so cached outputs are rebuilt whenever the code that wrote them changes."""
+    digest = hashlib.sha1()
+    for path in sorted((SRC / "asie").rglob("*.py")):
+        digest.update(path.relative_to(SRC).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def prepare_data(scale, seed, regenerate):
+    work = WORK_DIR / f"{scale}-{seed}"
+    raw_root = work / "raw"
+    processed_root = work / "processed"
+    stamp = work / "REVISION"
+    revision = code_revision()
+    if work.exists() and (not stamp.exists() or stamp.read_text(encoding="utf-8").strip() != revision):
+        print(f"Cached {scale} data was built by other code; regenerating")
+        regenerate = True
+    if regenerate:
+        shutil.rmtree(work, ignore_errors=True)
+    if not raw_root.exists():
+        start = time.perf_counter()
+        rows = generate_raw(raw_root, scale=scale, seed=seed)
+        counts = ", ".join(f"{name} {n:,}" for name, n in rows.items())
+        print(f"Generated {scale} dataset ({sum(rows.values()):,} rows: {counts}) in {time.perf_counter() - start:.1f}s")
+    if not (processed_root / "metrics_district_M.parquet").exists():
+        for level in ["state", "district"]:
+            run_pipeline(
+                geo_level=level,
+                raw_root=raw_root,
+                processed_root=processed_root,
+                report_path=processed_root / f"summary_{level}.md",
+                anomaly_threshold=2.0,
+            )
+        forecast.run_forecasts(processed_root)
+    stamp.write_text(revision + "\n", encoding="utf-8")
+    return raw_root, processed_root
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        ref = baseline.get(name)
+        if ref is None:
+            print(f"  {name:<45} {seconds * 1000:10.1f} ms   (no baseline)")
+            continue
+        ratio = seconds / ref if ref else float("inf")
+        flag = ""
+        # Ignore sub-millisecond noise when judging regressions
+        if ratio > 1 + threshold and seconds - ref > 1e-3:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<45} {seconds * 1000:10.1f} ms   x{ratio:4.2f} vs {ref * 1000:.1f} ms{flag}")
+    return regressions
+
+
+def machine_info() -> dict:
+    """Where a baseline was recorded; timings are only comparable on a matching machine."""
+    cpu = platform.processor()
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        models = [line.split(":", 1)[1].strip() for line in cpuinfo.read_text().splitlines() if line.startswith("model name")]
+        cpu = models[0] if models else cpu
+    return {
+        "platform": platform.platform(),
+        "cpu": cpu or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return out.stdout.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline ASIE benchmarks on seeded synthetic data.")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--levels", nargs="+", default=["state", "district"], choices=["state", "district", "pincode"])
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the synthetic dataset (also done on --save-baseline and whenever src/asie changes)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these timings as the baseline for --scale")
+    args = parser.parse_args(argv)
+
+    # A baseline is only meaningful on outputs written by the code being measured
+    raw_root, processed_root = prepare_data(args.scale, args.seed, args.regenerate or args.save_baseline)
+    results = {}
+    for level in args.levels:
+        results.update(bench_stages(raw_root, processed_root, level, args.repeat))
+    if not args.skip_api:
+        results.update(bench_api(processed_root, args.repeat))
+
+    baselines = json.loads(BASELINES.read_text(encoding="utf-8")) if BASELINES.exists() else {}
+    key = f"{args.scale}-seed{args.seed}"
+    if args.save_baseline:
+        baselines[key] = {
+            "machine": machine_info(),
+            "conditions": {
+                "recorded_at": time.strftime("%Y-%m-%d", time.gmtime()),
+                "repeat": args.repeat,
+                "statistic": "median",
+                "levels": args.levels,
+                "api": not args.skip_api,
+                "commit": git_commit(),
+                "code_revision": code_revision(),
+            },
+            "timings": {k: round(v, 6) for k, v in sorted(results.items())},
+        }
+        BASELINES.parent.mkdir(parents=True, exist_ok=True)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Saved baseline {key} to {BASELINES}")
+
+    print(f"Benchmark {key} (median of {args.repeat}):")
+    regressions = compare(results, baselines.get(key, {}).get("timings", {}), args.threshold)
+    if regressions and not args.save_baseline:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
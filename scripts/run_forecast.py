@@ -1,4 +1,5 @@
 from pathlib import Path
+import argparse
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -7,6 +8,15 @@ if str(SRC) not in sys.path:
     sys.path.append(str(SRC))
 
 from asie.forecast import run_forecasts
+from asie.profiling import add_profile_args, run_maybe_profiled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast ASIE metrics from processed parquet.")
+    add_profile_args(parser)
+    args = parser.parse_args(argv)
+    run_maybe_profiled(lambda: run_forecasts(processed_root=ROOT / "data" / "processed", periods_ahead=6), args)
+
 
 if __name__ == "__main__":
-    run_forecasts(processed_root=ROOT / "data" / "processed", periods_ahead=6)
+    main()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import argparse
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -6,15 +7,36 @@ SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.append(str(SRC))
 
+from asie.anomalies import add_anomaly_args
 from asie.pipeline import run_pipeline
+from asie.profiling import add_profile_args, run_maybe_profiled
+from asie.reporting import add_report_args
 
 
-if __name__ == "__main__":
-    run_pipeline(
-        geo_level="district",
-        freq="M",
-        raw_root=ROOT / "data" / "raw",
-        processed_root=ROOT / "data" / "processed",
-        report_path=ROOT / "reports" / "summary_district.md",
-        anomaly_threshold=2.0,
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ASIE pipeline at district level.")
+    add_report_args(parser)
+    add_anomaly_args(parser)
+    add_profile_args(parser)
+    args = parser.parse_args(argv)
+    run_maybe_profiled(
+        lambda: run_pipeline(
+            geo_level="district",
+            freq="M",
+            raw_root=ROOT / "data" / "raw",
+            processed_root=ROOT / "data" / "processed",
+            report_path=ROOT / "reports" / "summary_district.md",
+            anomaly_threshold=2.0,
+            report_formats=args.formats,
+            geo_reports_dir=args.geo_reports,
+            report_workers=args.report_workers or None,
+            anomaly_methods=args.anomaly_method or ("zscore",),
+            anomaly_joint_metrics=args.anomaly_joint_metrics,
+            anomaly_workers=args.anomaly_workers,
+        ),
+        args,
     )
+
+
+if __name__ == "__main__":
+    main()
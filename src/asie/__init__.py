@@ -4,4 +4,4 @@ Lightweight utilities to ingest aggregated Aadhaar datasets and compute
 composite indices, anomalies, and decision-ready summaries.
 """
 
-__all__ = ["data_loader", "metrics", "anomalies", "pipeline", "forecast"]
+__all__ = ["data_loader", "metrics", "anomalies", "pipeline", "forecast", "charts", "profiling", "synthetic", "snapshot", "diffs", "sketches", "rollups", "quality", "reporting"]
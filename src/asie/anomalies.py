@@ -1,37 +1,325 @@
 from __future__ import annotations
 
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
 import numpy as np
 import pandas as pd
 
+from . import profiling
+
+# Floor for dispersion estimates so flat series do not divide by zero
+_EPS = 1e-9
+# MAD / 0.6745 and mean-absolute-deviation * 1.2533 both estimate sigma for normal data
+_MAD_TO_SIGMA = 1 / 0.6745
+_MEANAD_TO_SIGMA = 1.2533
+# A MAD this small relative to the mean absolute deviation is rounding noise, not spread
+_MAD_TOLERANCE = 1e-6
+# Parquet key-value metadata listing the methods a stored anomalies table was scored with
+METHODS_METADATA_KEY = b"asie.anomaly_methods"
+
+Scorer = Callable[..., np.ndarray]
+METHODS: Dict[str, Scorer] = {}
+
+
+def register_method(name: str) -> Callable[[Scorer], Scorer]:
+    """Register a scorer under ``name`` for ``detect_anomalies(method=name)``.
+
+    A scorer receives a :class:`GroupedSeries` and keyword parameters and
+    returns an ``(n_rows, n_metrics)`` array of signed scores on a z-like
+    scale (NaN where it cannot score).
+    """
+
+    def _wrap(func: Scorer) -> Scorer:
+        METHODS[name] = func
+        return func
+
+    return _wrap
+
+
+class GroupedSeries:
+    """Metric columns of a frame sorted by group then period, plus per-row group bookkeeping."""
+
+    def __init__(self, df: pd.DataFrame, value_cols: Sequence[str], group_keys: Sequence[str]):
+        self.frame = df.sort_values([*group_keys, "period"], kind="mergesort").reset_index(drop=True)
+        self.value_cols = list(value_cols)
+        self.group_keys = list(group_keys)
+        self.values = self.frame[self.value_cols].to_numpy(dtype=float)
+        self.codes = self.frame.groupby(self.group_keys, sort=False, dropna=False).ngroup().to_numpy()
+        n = len(self.frame)
+        change = np.ones(n, dtype=bool)
+        change[1:] = self.codes[1:] != self.codes[:-1]
+        # Row index where each row's group starts, and the row's position inside it
+        self.start = np.maximum.accumulate(np.where(change, np.arange(n), 0)) if n else np.array([], dtype=int)
+        self.position = np.arange(n) - self.start
+
+    def transform(self, values: np.ndarray, how: str) -> np.ndarray:
+        """Per-group aggregate broadcast back to rows (NaN-skipping)."""
+        return pd.DataFrame(values).groupby(self.codes).transform(how).to_numpy(dtype=float)
+
+    def prior_sums(self, columns: np.ndarray) -> np.ndarray:
+        """Sums over all earlier rows of the same group, excluding the row itself.
+
+        Cumulative sums restart per group, so for count data they stay exact
+        and flat histories give exactly zero spread.
+        """
+        return pd.DataFrame(columns).groupby(self.codes).cumsum().to_numpy(dtype=float) - columns
+
+
+def robust_z(residuals: np.ndarray, grouped: GroupedSeries, center: bool = True) -> np.ndarray:
+    """(x - median) / sigma with sigma from the group's MAD (mean absolute deviation when MAD is 0)."""
+    med = grouped.transform(residuals, "median") if center else np.zeros_like(residuals)
+    dev = np.abs(residuals - med)
+    mad = grouped.transform(dev, "median")
+    meanad = grouped.transform(dev, "mean")
+    sigma = np.where(mad > _MAD_TOLERANCE * meanad, mad * _MAD_TO_SIGMA, meanad * _MEANAD_TO_SIGMA)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (residuals - med) / np.maximum(sigma, _EPS)
+
+
+@register_method("zscore")
+def _score_zscore(grouped: GroupedSeries) -> np.ndarray:
+    """Global z-score against each group's full-history mean and (population) std."""
+    mean = grouped.transform(grouped.values, "mean")
+    centered = grouped.values - mean
+    std = np.sqrt(grouped.transform(centered**2, "mean"))
+    return centered / np.where(std > 0, std, _EPS)
+
+
+@register_method("rolling_zscore")
+def _score_rolling(
+    grouped: GroupedSeries, window: int = 6, min_periods: int = 3, min_std: float = 1.0
+) -> np.ndarray:
+    """z-score against the mean/std of the previous ``window`` periods, so trends do not accumulate.
+
+    The metrics are counts, so a flat window is given at least ``min_std``
+    of spread rather than turning a one-unit change into an infinite score.
+    """
+    prior = pd.DataFrame(grouped.values).groupby(grouped.codes).rolling(window, min_periods=min_periods, closed="left")
+    # Rows come back grouped by code, which is already the row order
+    mean = prior.mean().to_numpy(dtype=float)
+    std = prior.std(ddof=0).to_numpy(dtype=float)
+    return (grouped.values - mean) / np.maximum(std, min_std)
+
+
+@register_method("mad")
+def _score_mad(grouped: GroupedSeries) -> np.ndarray:
+    """Robust z-score: distance from the group median in MAD-derived sigmas."""
+    return robust_z(grouped.values, grouped)
+
+
+@register_method("seasonal")
+def _score_seasonal(grouped: GroupedSeries, period_length: int = 12, min_cycles: int = 2) -> np.ndarray:
+    """Robust z-score of the residual after removing a linear trend and a month-of-cycle effect.
+
+    The seasonal effect of a calendar slot is only estimated once it has
+    been seen ``min_cycles`` times in the group; until then only the trend
+    is removed.
+    """
+    periods = pd.DatetimeIndex(grouped.frame["period"])
+    t = (periods.year * 12 + periods.month).to_numpy(dtype=float)[:, None]
+    x = grouped.values
+    dt = t - grouped.transform(np.broadcast_to(t, x.shape).copy(), "mean")
+    dx = x - grouped.transform(x, "mean")
+    slope = grouped.transform(dt * dx, "mean") / np.maximum(grouped.transform(dt**2, "mean"), _EPS)
+    detrended = dx - slope * dt
+
+    slot = pd.Series((t[:, 0] % period_length).astype(int))
+    keys = [pd.Series(grouped.codes), slot]
+    frame = pd.DataFrame(detrended)
+    seasonal = frame.groupby(keys).transform("mean").to_numpy(dtype=float)
+    seen = frame.notna().groupby(keys).transform("sum").to_numpy(dtype=float)
+    residual = detrended - np.where(seen >= min_cycles, seasonal, 0.0)
+    return robust_z(residual, grouped)
+
+
+@register_method("forecast_residual")
+def _score_forecast_residual(
+    grouped: GroupedSeries, forecast: Optional[pd.DataFrame] = None, min_history: int = 3
+) -> np.ndarray:
+    """Robust z-score of actual minus expected, scaled by the group's residual spread.
+
+    Expected values are one-step-ahead predictions of the linear trend model
+    in ``forecast.py`` (fit on index positions over all earlier periods).
+    Where a stored ``forecast`` frame (state[, district], metric, period,
+    forecast) has a point for a period that now has actuals, that published
+    forecast is used instead.
+    """
+    x = grouped.values
+    valid = ~np.isnan(x)
+    p = np.broadcast_to(grouped.position[:, None].astype(float), x.shape)
+    w = valid.astype(float)
+    n = grouped.prior_sums(w)
+    sp = grouped.prior_sums(p * w)
+    sx = grouped.prior_sums(np.where(valid, x, 0.0))
+    spp = grouped.prior_sums(p * p * w)
+    spx = grouped.prior_sums(np.where(valid, p * x, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * spx - sp * sx) / (n * spp - sp**2)
+        intercept = (sx - slope * sp) / n
+    expected = np.where(n >= min_history, intercept + slope * p, np.nan)
+
+    if forecast is not None and not forecast.empty:
+        fc = forecast.assign(period=_as_timestamp(forecast["period"]))
+        keys = [*[k for k in grouped.group_keys if k in fc.columns], "period"]
+        for j, metric in enumerate(grouped.value_cols):
+            part = fc.loc[fc["metric"] == metric, [*keys, "forecast"]]
+            if part.empty:
+                continue
+            matched = grouped.frame[keys].merge(part, on=keys, how="left")["forecast"].to_numpy(dtype=float)
+            expected[:, j] = np.where(np.isnan(matched), expected[:, j], matched)
+
+    return robust_z(grouped.values - expected, grouped, center=False)
+
+
+def _as_timestamp(period: pd.Series) -> pd.Series:
+    if isinstance(period.dtype, pd.PeriodDtype):
+        return period.dt.to_timestamp()
+    return pd.to_datetime(period)
+
+
+def _empty(group_keys: Sequence[str]) -> pd.DataFrame:
+    return pd.DataFrame(columns=["period", *group_keys, "metric", "zscore", "direction", "method", "metrics"])
+
+
+def _flag(grouped: GroupedSeries, scores: np.ndarray, threshold: float, method: str) -> pd.DataFrame:
+    rows, cols = np.nonzero(np.abs(np.nan_to_num(scores)) >= threshold)
+    metrics = np.asarray(grouped.value_cols, dtype=object)[cols]
+    flagged = grouped.frame.loc[rows, ["period", *grouped.group_keys]].reset_index(drop=True)
+    flagged["metric"] = metrics
+    flagged["zscore"] = scores[rows, cols]
+    flagged["direction"] = np.where(flagged["zscore"] > 0, "spike", "drop")
+    flagged["method"] = method
+    flagged["metrics"] = metrics
+    return flagged
+
+
+def joint_anomalies(
+    grouped: GroupedSeries, scores: np.ndarray, threshold: float, min_metrics: int, method: str
+) -> pd.DataFrame:
+    """Geography-periods where at least ``min_metrics`` metrics exceed ``threshold`` together.
+
+    The joint score is the signed root-mean-square of the contributing
+    scores (sign of their sum), so co-moving moderate deviations surface
+    even when no single metric would be flagged at the full threshold.
+    """
+    hit = np.abs(np.nan_to_num(scores)) >= threshold
+    rows = np.flatnonzero(hit.sum(axis=1) >= min_metrics)
+    contrib = np.where(hit[rows], scores[rows], 0.0)
+    rms = np.sqrt((contrib**2).sum(axis=1) / np.maximum(hit[rows].sum(axis=1), 1))
+    signed = np.where(contrib.sum(axis=1) >= 0, rms, -rms)
+    names = np.asarray(grouped.value_cols, dtype=object)
+    joint = grouped.frame.loc[rows, ["period", *grouped.group_keys]].reset_index(drop=True)
+    joint["metric"] = "joint"
+    joint["zscore"] = signed
+    joint["direction"] = np.where(signed > 0, "spike", "drop")
+    joint["method"] = method
+    joint["metrics"] = ["+".join(names[mask]) for mask in hit[rows]]
+    return joint
+
+
+def _detect_shard(args) -> pd.DataFrame:
+    df, value_cols, group_keys, threshold, methods, params, joint_threshold, joint_min_metrics = args
+    grouped = GroupedSeries(df, value_cols, group_keys)
+    parts = []
+    for method in methods:
+        with profiling.stage(method, rows_in=len(df)) as rec:
+            scores = METHODS[method](grouped, **params.get(method, {}))
+            flagged = _flag(grouped, scores, threshold, method)
+            if joint_min_metrics and len(value_cols) >= joint_min_metrics:
+                flagged = pd.concat(
+                    [flagged, joint_anomalies(grouped, scores, joint_threshold, joint_min_metrics, method)],
+                    ignore_index=True,
+                )
+            rec["rows_out"] = len(flagged)
+        parts.append(flagged)
+    return pd.concat(parts, ignore_index=True) if parts else _empty(group_keys)
+
 
 def detect_anomalies(
     df: pd.DataFrame,
     value_cols: list[str],
     group_keys: list[str],
     threshold: float = 3.0,
+    method: str | Sequence[str] = "zscore",
+    params: Optional[Dict[str, Dict]] = None,
+    joint_threshold: Optional[float] = None,
+    joint_min_metrics: int = 0,
+    workers: int = 1,
 ) -> pd.DataFrame:
-    """Detect z-score based anomalies per group for given value columns."""
+    """Detect anomalies per group for the given value columns.
+
+    ``method`` is one or more of :data:`METHODS` (``zscore``,
+    ``rolling_zscore``, ``mad``, ``seasonal``, ``forecast_residual``);
+    per-method keyword arguments go in ``params`` (e.g.
+    ``{"forecast_residual": {"forecast": fc}}``). Every method scores all
+    groups and metrics at once on a z-like scale and rows with
+    ``|score| >= threshold`` are returned, tagged with ``method``.
+
+    With ``joint_min_metrics`` set, geography-periods where that many metrics
+    reach ``joint_threshold`` (default ``0.75 * threshold``) are added as
+    ``metric == "joint"`` rows listing the contributing ``metrics``. With
+    ``workers > 1`` groups are split into shards by their first key and
+    scored in a process pool.
+    """
     if "period" not in df.columns:
         raise ValueError("period column required for anomaly detection")
+    methods = [method] if isinstance(method, str) else list(method)
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        raise ValueError(f"unknown anomaly method(s) {unknown}; choose from: {', '.join(METHODS)}")
+    params = params or {}
+    joint_threshold = joint_threshold if joint_threshold is not None else 0.75 * threshold
+    shared = (value_cols, group_keys, threshold, methods, params, joint_threshold, joint_min_metrics)
+
+    if workers > 1 and len(df):
+        shard_of = df.groupby(group_keys[0], sort=False, dropna=False).ngroup() % workers
+        jobs = [(part, *shared) for _, part in df.groupby(shard_of.to_numpy(), sort=True)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_detect_shard, jobs))
+        result = pd.concat(parts, ignore_index=True)
+    else:
+        result = _detect_shard((df, *shared))
+
+    # Shards or methods that flag nothing contribute empty object columns; keep the labels str either way
+    result = result.astype({c: str for c in ["metric", "direction", "method", "metrics"]})
+    return result.sort_values(["period", "metric", *group_keys, "method"], kind="mergesort").reset_index(drop=True)
+
+
+def write_anomalies(df: pd.DataFrame, path: Path | str, methods: Sequence[str]) -> Path:
+    """Write an anomalies table to parquet, recording the scoring ``methods`` in the file metadata.
+
+    A method that ran but flagged nothing leaves no rows, so readers take the
+    stored methods from :func:`stored_methods`, not from the ``method`` column.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), METHODS_METADATA_KEY: json.dumps(list(methods)).encode()}
+    pq.write_table(table.replace_schema_metadata(metadata), path)
+    return path
 
-    df_sorted = df.sort_values([*group_keys, "period"])
-    anomalies = []
 
-    for col in value_cols:
-        def _zs(group: pd.Series) -> pd.Series:
-            mean = group.mean()
-            std = group.std(ddof=0) or 1e-9
-            return (group - mean) / std
+def stored_methods(path: Path | str) -> Optional[List[str]]:
+    """Methods recorded by :func:`write_anomalies`; ``None`` for tables written without them."""
+    import pyarrow.parquet as pq
 
-        zscores = df_sorted.groupby(group_keys)[col].transform(_zs)
-        mask = zscores.abs() >= threshold
-        flagged = df_sorted.loc[mask, ["period", *group_keys]].copy()
-        flagged["metric"] = col
-        flagged["zscore"] = zscores.loc[mask]
-        flagged["direction"] = np.where(flagged["zscore"] > 0, "spike", "drop")
-        anomalies.append(flagged)
+    metadata = pq.read_schema(path).metadata or {}
+    if METHODS_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[METHODS_METADATA_KEY])
 
-    if not anomalies:
-        return pd.DataFrame(columns=["period", *group_keys, "metric", "zscore", "direction"])
 
-    return pd.concat(anomalies, ignore_index=True).sort_values(["period", "metric"])
+def add_anomaly_args(parser) -> None:
+    """Shared anomaly-engine flags for the ``scripts/`` pipeline entry points."""
+    parser.add_argument(
+        "--anomaly-method", action="append", choices=list(METHODS), help="Repeatable; defaults to zscore"
+    )
+    parser.add_argument(
+        "--anomaly-joint-metrics", type=int, default=0, help="Add joint rows where this many metrics deviate together (0 = off)"
+    )
+    parser.add_argument("--anomaly-workers", type=int, default=1, help="Processes for per-shard anomaly scoring")
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")  # headless rendering in workers and API processes
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+INDEX_COLUMNS = [
+    "digital_inclusion_index",
+    "migration_intensity_score",
+    "service_stress_index",
+    "data_quality_friction_index",
+    "biometric_failure_risk_score",
+]
+
+MANIFEST_NAME = ".chart_manifest.json"
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """What to draw: a top-N bar chart or a single-geography timeseries."""
+
+    kind: str  # "top" | "timeseries"
+    metric: str
+    level: str = "state"  # "state" | "district"
+    state: Optional[str] = None
+    district: Optional[str] = None
+    period: Optional[str] = None  # YYYY-MM; latest when omitted
+    n: int = 10
+    title: str = ""
+
+
+def geo_cols_for(level: str) -> List[str]:
+    if level not in {"state", "district"}:
+        raise ValueError("level must be one of: state, district")
+    return ["state"] if level == "state" else ["state", "district"]
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "na"
+
+
+def select_slice(df: pd.DataFrame, spec: ChartSpec, forecast: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Reduce a metrics frame to exactly the rows/columns a chart draws.
+
+    For timeseries, ``forecast`` (long format: state[, district], metric,
+    period, forecast) is appended as a ``forecast`` column on future periods.
+    """
+    geo_cols = geo_cols_for(spec.level)
+    if spec.state:
+        df = df[df["state"].str.lower() == spec.state.lower()]
+    if spec.kind == "top":
+        if spec.period:
+            df = df[df["period"] == pd.Period(spec.period).to_timestamp()]
+        elif not df.empty:
+            df = df[df["period"] == df["period"].max()]
+        return df.nlargest(spec.n, spec.metric)[[*geo_cols, spec.metric]].reset_index(drop=True)
+    if spec.kind == "timeseries":
+        if spec.level == "district":
+            df = df[df["district"].str.lower() == (spec.district or "").lower()]
+        data = df.sort_values("period")[["period", spec.metric]].reset_index(drop=True)
+        if forecast is None or data.empty:
+            return data
+        fc = forecast[(forecast["metric"] == spec.metric) & (forecast["state"].str.lower() == (spec.state or "").lower())]
+        if spec.level == "district":
+            fc = fc[fc["district"].str.lower() == (spec.district or "").lower()]
+        if fc.empty:
+            return data
+        fc = fc.sort_values("period")[["period", "forecast"]]
+        # Anchor the forecast line on the last actual point so the two connect
+        anchor = pd.DataFrame({"period": [data["period"].iloc[-1]], "forecast": [data[spec.metric].iloc[-1]]})
+        return pd.concat([data, anchor, fc], ignore_index=True)
+    raise ValueError(f"Unknown chart kind: {spec.kind}")
+
+
+def slice_hash(data: pd.DataFrame, spec: ChartSpec) -> str:
+    """Content hash of the chart spec plus the exact slice it renders."""
+    h = hashlib.sha256(json.dumps(asdict(spec), sort_keys=True).encode("utf-8"))
+    h.update(",".join(map(str, data.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def default_title(spec: ChartSpec) -> str:
+    if spec.title:
+        return spec.title
+    if spec.kind == "top":
+        scope = spec.state if spec.state else spec.level.capitalize()
+        suffix = f" ({spec.period})" if spec.period else ""
+        return f"{scope}: Top {spec.n} {spec.metric}{suffix}"
+    geo = spec.district if spec.level == "district" else spec.state
+    return f"{geo}: {spec.metric}"
+
+
+def render_chart(data: pd.DataFrame, spec: ChartSpec, fmt: str = "png", dpi: int = 200) -> bytes:
+    """Render a prepared slice (see ``select_slice``) to PNG or SVG bytes."""
+    if spec.kind == "top":
+        label_col = geo_cols_for(spec.level)[-1]
+        fig = plt.figure(figsize=(10, 6))
+        sns.barplot(y=label_col, x=spec.metric, data=data, hue=label_col, palette="viridis", legend=False)
+    else:
+        fig = plt.figure(figsize=(10, 5))
+        actual = data.dropna(subset=[spec.metric])
+        plt.plot(actual["period"], actual[spec.metric], marker="o", color="#0f766e", label="actual")
+        if "forecast" in data.columns:
+            fc = data.dropna(subset=["forecast"])
+            plt.plot(fc["period"], fc["forecast"], linestyle="--", marker=".", color="#b45309", label="forecast")
+            plt.legend()
+        plt.xlabel("period")
+        plt.ylabel(spec.metric)
+    plt.title(default_title(spec))
+    plt.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def _render_to_file(job: Tuple[pd.DataFrame, ChartSpec, str, int]) -> str:
+    data, spec, outfile, dpi = job
+    fmt = Path(outfile).suffix.lstrip(".") or "png"
+    payload = render_chart(data, spec, fmt=fmt, dpi=dpi)
+    tmp = f"{outfile}.tmp"
+    Path(tmp).write_bytes(payload)
+    os.replace(tmp, outfile)
+    return outfile
+
+
+def chart_path(plots_dir: Path, spec: ChartSpec, family: str = "latest") -> Path:
+    """Output location under the ``/charts`` mount for a spec in a family."""
+    label = geo_cols_for(spec.level)[-1]
+    if spec.kind == "top":
+        name = f"top_{spec.metric}_{label}.png"
+    else:
+        name = f"ts_{spec.metric}.png"
+    if family == "latest":
+        return plots_dir / name
+    if family == "period":
+        return plots_dir / "period" / spec.level / str(spec.period) / name
+    if family == "state":
+        return plots_dir / "state" / slugify(spec.state or "") / name
+    if family == "district":
+        return plots_dir / "district" / slugify(spec.state or "") / slugify(spec.district or "") / name
+    raise ValueError(f"Unknown chart family: {family}")
+
+
+def family_specs(
+    family: str,
+    frames: Dict[str, pd.DataFrame],
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    period: Optional[str] = None,
+    metrics: Sequence[str] = INDEX_COLUMNS,
+    n: int = 10,
+) -> List[ChartSpec]:
+    """Expand a chart family into concrete specs.
+
+    ``latest``: top-N per index at state and district level (the static set).
+    ``period``: the same for one ``period``.
+    ``state``: top-N districts within ``state`` (all states when omitted).
+    ``district``: per-index timeseries for ``district`` (or every district of ``state``).
+    """
+    levels = [lvl for lvl in ("state", "district") if lvl in frames]
+    if family in {"latest", "period"}:
+        if family == "period" and not period:
+            raise ValueError("period family requires a period (YYYY-MM)")
+        return [
+            ChartSpec(
+                "top",
+                m,
+                level=lvl,
+                period=period if family == "period" else None,
+                n=n,
+                title="" if family == "period" else f"{lvl.capitalize()}: Top {n} {m}",
+            )
+            for lvl in levels
+            for m in metrics
+        ]
+    if "district" not in frames:
+        raise ValueError(f"{family} family requires district metrics")
+    df = frames["district"]
+    if family == "state":
+        states = [state] if state else sorted(df["state"].dropna().unique().tolist())
+        return [ChartSpec("top", m, level="district", state=s, period=period, n=n) for s in states for m in metrics]
+    if family == "district":
+        pairs = df[["state", "district"]].dropna().drop_duplicates()
+        if state:
+            pairs = pairs[pairs["state"].str.lower() == state.lower()]
+        if district:
+            pairs = pairs[pairs["district"].str.lower() == district.lower()]
+        return [
+            ChartSpec("timeseries", m, level="district", state=s, district=d)
+            for s, d in sorted(pairs.itertuples(index=False, name=None))
+            for m in metrics
+        ]
+    raise ValueError(f"Unknown chart family: {family}")
+
+
+def _load_manifest(plots_dir: Path) -> Dict[str, str]:
+    path = plots_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def _save_manifest(plots_dir: Path, manifest: Dict[str, str]) -> None:
+    path = plots_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def evict_by_size(plots_dir: Path, max_bytes: int, manifest: Optional[Dict[str, str]] = None) -> List[Path]:
+    """Delete least-recently-used on-demand charts until the cache fits ``max_bytes``.
+
+    Only files inside family subdirectories are eligible; the top-level static
+    set is always kept.
+    """
+    files = [p for p in plots_dir.glob("*/**/*") if p.is_file() and p.suffix in {".png", ".svg"}]
+    stats = [(p, p.stat()) for p in files]
+    total = sum(st.st_size for _, st in stats)
+    removed: List[Path] = []
+    for path, st in sorted(stats, key=lambda item: max(item[1].st_atime, item[1].st_mtime)):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= st.st_size
+        removed.append(path)
+        if manifest is not None:
+            manifest.pop(path.relative_to(plots_dir).as_posix(), None)
+    return removed
+
+
+def render_family(
+    plots_dir: Path,
+    frames: Dict[str, pd.DataFrame],
+    specs: Iterable[ChartSpec],
+    family: str = "latest",
+    workers: Optional[int] = None,
+    force: bool = False,
+    dpi: int = 200,
+    max_cache_bytes: Optional[int] = None,
+) -> Dict[str, List[Path]]:
+    """Render charts whose input slice changed, in a process pool.
+
+    Returns ``{"rendered": [...], "skipped": [...], "evicted": [...]}``.
+    """
+    plots_dir = Path(plots_dir)
+    plots_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(plots_dir)
+
+    jobs = []
+    skipped: List[Path] = []
+    for spec in specs:
+        data = select_slice(frames[spec.level], spec)
+        if data.empty:
+            continue
+        outfile = chart_path(plots_dir, spec, family=family)
+        key = outfile.relative_to(plots_dir).as_posix()
+        digest = slice_hash(data, spec)
+        if not force and manifest.get(key) == digest and outfile.exists():
+            skipped.append(outfile)
+            continue
+        outfile.parent.mkdir(parents=True, exist_ok=True)
+        manifest[key] = digest
+        jobs.append((data, spec, str(outfile), dpi))
+
+    rendered: List[Path] = []
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            rendered = [Path(_render_to_file(job)) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = [Path(p) for p in pool.map(_render_to_file, jobs)]
+
+    evicted: List[Path] = []
+    if max_cache_bytes is not None:
+        evicted = evict_by_size(plots_dir, max_cache_bytes, manifest=manifest)
+    _save_manifest(plots_dir, manifest)
+    return {"rendered": rendered, "skipped": skipped, "evicted": evicted}
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import glob
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence
 
 import pandas as pd
 
+from . import profiling
+from .quality import QualityReport
+
 # Default date format in datasets
 DATE_FMT = "%d-%m-%Y"
 
@@ -31,13 +34,12 @@ def _aggregate_chunk(
     value_cols: Sequence[str],
     freq: str,
     geo_cols: Sequence[str],
+    quality: QualityReport,
+    file: str,
+    first_line: int,
 ) -> pd.DataFrame:
-    # Parse and normalize date
-    chunk["date"] = pd.to_datetime(chunk["date"], format=DATE_FMT, errors="coerce")
-    chunk = chunk.dropna(subset=["date"])
-    # Normalize pincode as string with leading zeros when present
-    if "pincode" in chunk.columns:
-        chunk["pincode"] = chunk["pincode"].astype(str).str.zfill(6)
+    # Reject bad dates/counts/geographies, parse dates and canonicalize names
+    chunk = quality.validate(chunk, file, first_line, value_cols, date_format=DATE_FMT)
     # Collapse to period
     chunk["period"] = chunk["date"].dt.to_period(freq).dt.to_timestamp()
     # Total across provided value columns
@@ -58,6 +60,7 @@ def aggregate_csv_dir(
     freq: str = "M",
     geo_level: str = "state",
     glob_pattern: str = "*.csv",
+    quality: Optional[QualityReport] = None,
 ) -> pd.DataFrame:
     """Aggregate multiple CSVs in a directory by time period and geography.
 
@@ -69,6 +72,7 @@ def aggregate_csv_dir(
     freq: pandas period frequency string (e.g., "M" for monthly)
     geo_level: one of state|district|pincode
     glob_pattern: file pattern to match
+    quality: collects per-file rejections and name fixes (rows are validated either way)
     """
 
     base = _ensure_path(csv_dir)
@@ -77,52 +81,75 @@ def aggregate_csv_dir(
         raise FileNotFoundError(f"No CSV files found in {base}")
 
     geo_cols = _geo_cols_for_level(geo_level)
+    quality = quality if quality is not None else QualityReport()
     frames: List[pd.DataFrame] = []
 
-    for file in files:
-        for chunk in pd.read_csv(
-            file,
-            chunksize=200_000,
-            dtype={"state": "string", "district": "string", "pincode": "string"},
-        ):
-            if rename_map:
-                chunk = chunk.rename(columns=rename_map)
-            # keep only necessary columns
-            needed_cols = ["date", *geo_cols, *value_cols]
-            chunk = chunk[needed_cols]
-            agg = _aggregate_chunk(chunk, value_cols=value_cols, freq=freq, geo_cols=geo_cols)
-            frames.append(agg)
+    with profiling.stage("read_aggregate") as rec:
+        rows_read = 0
+        for file in files:
+            first_line = 0
+            for chunk in pd.read_csv(
+                file,
+                chunksize=200_000,
+                dtype={"state": "string", "district": "string", "pincode": "string"},
+            ):
+                rows_read += len(chunk)
+                if rename_map:
+                    chunk = chunk.rename(columns=rename_map)
+                # keep only necessary columns
+                # Only this level's geo columns are validated, so finer ones cannot drop rows from coarser totals
+                needed_cols = ["date", *geo_cols, *value_cols]
+                chunk = chunk[needed_cols]
+                agg = _aggregate_chunk(chunk, value_cols, freq, geo_cols, quality, file, first_line)
+                first_line += len(chunk)
+                frames.append(agg)
+        rows_kept = sum(quality.files[f]["rows_kept"] for f in files if f in quality.files)
+        rec.update(files=len(files), rows_read=rows_read, rows_rejected=rows_read - rows_kept)
 
     if not frames:
         return pd.DataFrame(columns=["period", *geo_cols, *value_cols, "total"])
 
-    combined = pd.concat(frames, ignore_index=True)
-    grouped = combined.groupby(["period", *geo_cols]).sum(min_count=1).reset_index()
+    with profiling.stage("combine", rows_in=sum(len(f) for f in frames)) as rec:
+        combined = pd.concat(frames, ignore_index=True)
+        grouped = combined.groupby(["period", *geo_cols]).sum(min_count=1).reset_index()
+        rec["rows_out"] = len(grouped)
     return grouped
 
 
-def load_enrolment(raw_root: Path | str, freq: str = "M", geo_level: str = "state") -> pd.DataFrame:
+def load_enrolment(
+    raw_root: Path | str, freq: str = "M", geo_level: str = "state", quality: Optional[QualityReport] = None
+) -> pd.DataFrame:
     base = _ensure_path(raw_root) / "enrolment" / "api_data_aadhar_enrolment"
     rename_map = {}
     value_cols = ["age_0_5", "age_5_17", "age_18_greater"]
-    df = aggregate_csv_dir(base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level)
+    df = aggregate_csv_dir(
+        base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level, quality=quality
+    )
     df = df.rename(columns={"total": "enrol_total"})
     return df
 
 
-def load_demographic(raw_root: Path | str, freq: str = "M", geo_level: str = "state") -> pd.DataFrame:
+def load_demographic(
+    raw_root: Path | str, freq: str = "M", geo_level: str = "state", quality: Optional[QualityReport] = None
+) -> pd.DataFrame:
     base = _ensure_path(raw_root) / "demographic" / "api_data_aadhar_demographic"
     rename_map = {"demo_age_17_": "demo_age_17_plus"}
     value_cols = ["demo_age_5_17", "demo_age_17_plus"]
-    df = aggregate_csv_dir(base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level)
+    df = aggregate_csv_dir(
+        base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level, quality=quality
+    )
     df = df.rename(columns={"total": "demo_total"})
     return df
 
 
-def load_biometric(raw_root: Path | str, freq: str = "M", geo_level: str = "state") -> pd.DataFrame:
+def load_biometric(
+    raw_root: Path | str, freq: str = "M", geo_level: str = "state", quality: Optional[QualityReport] = None
+) -> pd.DataFrame:
     base = _ensure_path(raw_root) / "biometric" / "api_data_aadhar_biometric"
     rename_map = {"bio_age_17_": "bio_age_17_plus"}
     value_cols = ["bio_age_5_17", "bio_age_17_plus"]
-    df = aggregate_csv_dir(base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level)
+    df = aggregate_csv_dir(
+        base, value_cols=value_cols, rename_map=rename_map, freq=freq, geo_level=geo_level, quality=quality
+    )
     df = df.rename(columns={"total": "bio_total"})
     return df
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+from .metrics import DEFAULT_INDEX_WEIGHTS
+
+LEVEL_GEO_COLS: Dict[str, List[str]] = {"state": ["state"], "district": ["state", "district"]}
+# Each diff section is capped so a full re-rank (e.g. a new latest period) stays a small event
+DIFF_MAX_ROWS = 200
+# Forecast points closer than this are treated as unchanged
+FORECAST_TOLERANCE = 1e-6
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    # to_json maps NaN/NA to null and numpy scalars to plain JSON numbers
+    return json.loads(df.to_json(orient="records"))
+
+
+def _with_month(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(period=df["period"].dt.strftime("%Y-%m"))
+
+
+def _latest(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if df is None or df.empty:
+        return None
+    return df[df["period"] == df["period"].max()]
+
+
+def ranking_changes(
+    old: Optional[pd.DataFrame],
+    new: pd.DataFrame,
+    geo_cols: List[str],
+    metrics: List[str],
+    limit: int = DIFF_MAX_ROWS,
+) -> Dict[str, Dict[str, Any]]:
+    """Geographies whose latest-period rank moved, per metric.
+
+    Ranks are descending (1 = highest), matching the summary tables. Rows
+    entering or leaving the latest period carry a null ``rank``/``prev_rank``.
+    """
+    new_latest = _latest(new)
+    old_latest = _latest(old)
+    out: Dict[str, Dict[str, Any]] = {}
+    if new_latest is None:
+        return out
+    for metric in metrics:
+        if metric not in new_latest.columns:
+            continue
+        cur = new_latest[geo_cols].assign(
+            value=new_latest[metric].round(2), rank=new_latest[metric].rank(ascending=False, method="min")
+        )
+        if old_latest is not None and metric in old_latest.columns:
+            prev = old_latest[geo_cols].assign(prev_rank=old_latest[metric].rank(ascending=False, method="min"))
+        else:
+            prev = pd.DataFrame(columns=[*geo_cols, "prev_rank"])
+        merged = cur.merge(prev, on=geo_cols, how="outer")
+        both_missing = merged["rank"].isna() & merged["prev_rank"].isna()
+        changed = merged[merged["rank"].ne(merged["prev_rank"]) & ~both_missing]
+        if changed.empty:
+            continue
+        move = (changed["prev_rank"] - changed["rank"]).abs().fillna(float("inf"))
+        changed = changed.assign(_move=move).sort_values(["_move", "rank"], ascending=[False, True]).drop(columns="_move")
+        changed = changed.astype({"rank": "Int64", "prev_rank": "Int64"})
+        out[metric] = {"rows": _records(changed.head(limit)), "total": len(changed)}
+    return out
+
+
+def new_anomalies(
+    old: Optional[pd.DataFrame], new: pd.DataFrame, geo_cols: List[str], limit: int = DIFF_MAX_ROWS
+) -> Dict[str, Any]:
+    """Anomaly rows in ``new`` whose (period, geo, metric[, method]) key is absent from ``old``."""
+    keys = ["period", *geo_cols, "metric"]
+    if "method" in new.columns and (old is None or "method" in old.columns):
+        keys.append("method")
+    cols = [*keys, "zscore", "direction"]
+    fresh = new[cols]
+    if old is not None and not old.empty:
+        seen = old[keys].drop_duplicates().assign(_seen=True)
+        fresh = fresh.merge(seen, on=keys, how="left")
+        fresh = fresh[fresh["_seen"].isna()].drop(columns="_seen")
+    fresh = fresh.sort_values(["period", "metric"], ascending=[False, True])
+    return {"rows": _records(_with_month(fresh.head(limit))), "total": len(fresh)}
+
+
+def forecast_updates(
+    old: Optional[pd.DataFrame], new: pd.DataFrame, geo_cols: List[str], limit: int = DIFF_MAX_ROWS
+) -> Dict[str, Any]:
+    """Forecast points that are new or moved by more than ``FORECAST_TOLERANCE``."""
+    keys = [*geo_cols, "metric", "period"]
+    cur = new[[*keys, "forecast"]]
+    if old is not None and not old.empty:
+        prev = old[[*keys, "forecast"]].rename(columns={"forecast": "prev_forecast"})
+        cur = cur.merge(prev, on=keys, how="left")
+    else:
+        cur = cur.assign(prev_forecast=float("nan"))
+    changed = cur[cur["prev_forecast"].isna() | (cur["forecast"] - cur["prev_forecast"]).abs().gt(FORECAST_TOLERANCE)]
+    changed = changed.sort_values(keys)
+    return {"rows": _records(_with_month(changed.head(limit))), "total": len(changed)}
+
+
+def snapshot_diff(
+    old: Mapping[str, Optional[pd.DataFrame]],
+    new: Mapping[str, Optional[pd.DataFrame]],
+    changed_tables: List[str],
+    metrics: Optional[List[str]] = None,
+    limit: int = DIFF_MAX_ROWS,
+) -> Dict[str, Any]:
+    """Compact diff between two published table sets, keyed by parquet name.
+
+    Only tables listed in ``changed_tables`` are compared. Sections report
+    ``rows`` (capped at ``limit``) and the uncapped ``total``, so a client
+    can tell when it should re-fetch the full endpoint instead.
+    """
+    metrics = metrics or list(DEFAULT_INDEX_WEIGHTS)
+    diff: Dict[str, Any] = {"rankings": {}, "anomalies": {}, "forecasts": {}, "latest_period": {}}
+    for level, geo_cols in LEVEL_GEO_COLS.items():
+        name = f"metrics_{level}_M.parquet"
+        if name in changed_tables and new.get(name) is not None:
+            old_df, new_df = old.get(name), new[name]
+            old_latest = _latest(old_df)
+            new_latest = _latest(new_df)
+            latest = {
+                "old": old_latest["period"].iloc[0].strftime("%Y-%m") if old_latest is not None else None,
+                "new": new_latest["period"].iloc[0].strftime("%Y-%m") if new_latest is not None else None,
+            }
+            if latest["old"] != latest["new"]:
+                diff["latest_period"][level] = latest
+            rankings = ranking_changes(old_df, new_df, geo_cols, metrics, limit=limit)
+            if rankings:
+                diff["rankings"][level] = rankings
+
+        name = f"anomalies_{level}_M.parquet"
+        if name in changed_tables and new.get(name) is not None:
+            section = new_anomalies(old.get(name), new[name], geo_cols, limit=limit)
+            if section["total"]:
+                diff["anomalies"][level] = section
+
+        name = f"forecast_{level}.parquet"
+        if name in changed_tables and new.get(name) is not None:
+            section = forecast_updates(old.get(name), new[name], geo_cols, limit=limit)
+            if section["total"]:
+                diff["forecasts"][level] = section
+    return diff
@@ -6,6 +6,8 @@ from typing import List
 import numpy as np
 import pandas as pd
 
+from . import profiling, snapshot
+
 
 def _fit_linear_forecast(series: pd.Series, steps: int = 6) -> np.ndarray:
     """Simple linear regression forecast on index positions."""
@@ -37,10 +39,18 @@ def forecast_metrics(df: pd.DataFrame, geo_cols: List[str], metrics: List[str],
                     "period": latest_period + step,
                     "forecast": float(round(value, 2)),
                 })
+    if not rows:
+        # No geography has enough history; keep the schema so readers and the snapshot still work
+        empty = pd.DataFrame({c: pd.Series(dtype=df[c].dtype if c in df.columns else object) for c in geo_cols})
+        return empty.assign(
+            metric=pd.Series(dtype=str),
+            period=pd.Series(dtype=pd.PeriodDtype("M")),
+            forecast=pd.Series(dtype=float),
+        )
     return pd.DataFrame(rows)
 
 
-def run_forecasts(processed_root: Path | str, periods_ahead: int = 6) -> None:
+def run_forecasts(processed_root: Path | str, periods_ahead: int = 6, run_report_path: Path | str | None = None) -> None:
     processed_root = Path(processed_root)
     state_path = processed_root / "metrics_state_M.parquet"
     district_path = processed_root / "metrics_district_M.parquet"
@@ -55,13 +65,23 @@ def run_forecasts(processed_root: Path | str, periods_ahead: int = 6) -> None:
         "data_quality_friction_index",
         "biometric_failure_risk_score",
     ]
+    if run_report_path is None:
+        run_report_path = processed_root / "run_report_forecast.json"
+
+    with profiling.run_report("forecast", path=run_report_path, periods_ahead=periods_ahead):
+        if state_path.exists():
+            df = pd.read_parquet(state_path)
+            with profiling.stage("forecast_state", rows_in=len(df)) as rec:
+                fc = forecast_metrics(df, geo_cols=["state"], metrics=metrics, periods_ahead=periods_ahead)
+                rec["rows_out"] = len(fc)
+            fc.to_parquet(processed_root / "forecast_state.parquet", index=False)
 
-    if state_path.exists():
-        df = pd.read_parquet(state_path)
-        fc = forecast_metrics(df, geo_cols=["state"], metrics=metrics, periods_ahead=periods_ahead)
-        fc.to_parquet(processed_root / "forecast_state.parquet", index=False)
+        if district_path.exists():
+            df = pd.read_parquet(district_path)
+            with profiling.stage("forecast_district", rows_in=len(df)) as rec:
+                fc = forecast_metrics(df, geo_cols=["state", "district"], metrics=metrics, periods_ahead=periods_ahead)
+                rec["rows_out"] = len(fc)
+            fc.to_parquet(processed_root / "forecast_district.parquet", index=False)
 
-    if district_path.exists():
-        df = pd.read_parquet(district_path)
-        fc = forecast_metrics(df, geo_cols=["state", "district"], metrics=metrics, periods_ahead=periods_ahead)
-        fc.to_parquet(processed_root / "forecast_district.parquet", index=False)
\ No newline at end of file
+        with profiling.stage("write_snapshot"):
+            snapshot.write_snapshot(processed_root)
@@ -1,13 +1,92 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Mapping, Optional
 
 import numpy as np
 import pandas as pd
-
-
-def _pct_rank(series: pd.Series) -> pd.Series:
-    return series.rank(pct=True).fillna(0.0)
+from scipy.stats import rankdata
+
+from . import profiling
+
+# Composite index -> {ranked signal: weight}. Signals are the columns built in
+# ``_index_signals``; override per index via ``compute_indices(weights=...)``.
+DEFAULT_INDEX_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "digital_inclusion_index": {"enrol_total": 0.4, "demo_total": 0.4, "demo_to_enrol": 0.2},
+    "migration_intensity_score": {"demo_to_enrol": 0.6, "demo_positive_diff": 0.4},
+    "service_stress_index": {"tx_load": 0.7, "tx_load_spike": 0.3},
+    "data_quality_friction_index": {"rework_ratio": 0.6, "demo_variability": 0.4},
+    "biometric_failure_risk_score": {"youth_bio_share": 0.6, "bio_to_enrol": 0.4},
+}
+
+
+def pct_rank_matrix(values: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """Percentile-rank every column of a 2-D array in one batched pass.
+
+    Matches ``Series.rank(pct=True).fillna(0.0)`` column by column (average
+    ties, NaNs excluded from the denominator and mapped to 0). When ``groups``
+    is given, ranks are computed independently within each group label.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D array")
+    if values.shape[0] == 0:
+        return np.zeros_like(values)
+
+    def _block(block: np.ndarray) -> np.ndarray:
+        ranks = rankdata(block, axis=0, nan_policy="omit")
+        counts = np.sum(~np.isnan(block), axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = ranks / counts
+        return np.nan_to_num(pct, nan=0.0)
+
+    if groups is None:
+        return _block(values)
+
+    groups = np.asarray(groups)
+    order = np.argsort(groups, kind="stable")
+    _, starts = np.unique(groups[order], return_index=True)
+    out = np.empty_like(values)
+    for idx in np.split(order, starts[1:]):
+        out[idx] = _block(values[idx])
+    return out
+
+
+def resolve_index_weights(weights: Optional[Mapping[str, Mapping[str, float]]] = None) -> Dict[str, Dict[str, float]]:
+    """Merge per-index weight overrides onto ``DEFAULT_INDEX_WEIGHTS``."""
+    resolved = {name: dict(w) for name, w in DEFAULT_INDEX_WEIGHTS.items()}
+    for name, w in (weights or {}).items():
+        if name not in resolved:
+            raise ValueError(f"Unknown index: {name}")
+        resolved[name] = dict(w)
+    return resolved
+
+
+def composite_indices(
+    signals: pd.DataFrame,
+    weights: Optional[Mapping[str, Mapping[str, float]]] = None,
+    groups: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Rank each referenced signal once and blend the ranks into weighted indices.
+
+    Returns one column per index, scaled 0-100 and rounded to 2 decimals.
+    """
+    resolved = resolve_index_weights(weights)
+    # Each signal is ranked once even when several indices reuse it
+    needed = list(dict.fromkeys(sig for w in resolved.values() for sig in w))
+    missing = [sig for sig in needed if sig not in signals.columns]
+    if missing:
+        raise ValueError(f"Unknown index signals: {missing}")
+
+    ranks = pct_rank_matrix(signals[needed].to_numpy(dtype=float), groups=groups)
+    pos = {sig: i for i, sig in enumerate(needed)}
+    scores = np.empty((len(signals), len(resolved)))
+    for j, w in enumerate(resolved.values()):
+        # Summed term by term in weight order (not a BLAS product) so values on a .xx5 edge round as before
+        total = 0.0
+        for sig, weight in w.items():
+            total = total + weight * ranks[:, pos[sig]]
+        scores[:, j] = total * 100
+    return pd.DataFrame(scores, index=signals.index, columns=list(resolved)).round(2)
 
 
 def _safe_div(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
@@ -30,15 +109,41 @@ def _group_positive_diff(df: pd.DataFrame, keys: List[str], col: str) -> pd.Seri
     )
 
 
-def compute_indices(enrol: pd.DataFrame, demo: pd.DataFrame, bio: pd.DataFrame) -> pd.DataFrame:
-    """Combine enrolment, demographic, and biometric aggregates into indices."""
+def _index_signals(combined: pd.DataFrame, group_keys: List[str]) -> pd.DataFrame:
+    """Raw (unranked) inputs referenced by the composite index weights."""
+    spike = combined.groupby(group_keys)["tx_load"].transform(lambda s: (s - s.mean()) / (s.std(ddof=0) + 1e-9))
+    rework_ratio = _safe_div(combined["demo_total"] + combined["bio_total"], combined["enrol_total"].replace(0, np.nan))
+    variability = combined.groupby(group_keys)["demo_total"].transform(lambda s: _safe_div(s.rolling(3, min_periods=1).std(), s.rolling(3, min_periods=1).mean() + 1e-9))
+    signal_cols = ["enrol_total", "demo_total", "demo_to_enrol", "demo_positive_diff", "tx_load", "youth_bio_share", "bio_to_enrol"]
+    signals = combined[signal_cols].copy()
+    signals["tx_load_spike"] = spike
+    signals["rework_ratio"] = rework_ratio.fillna(0)
+    signals["demo_variability"] = variability.fillna(0)
+    return signals
+
+
+def compute_indices(
+    enrol: pd.DataFrame,
+    demo: pd.DataFrame,
+    bio: pd.DataFrame,
+    weights: Optional[Mapping[str, Mapping[str, float]]] = None,
+    rank_by_period: bool = False,
+) -> pd.DataFrame:
+    """Combine enrolment, demographic, and biometric aggregates into indices.
+
+    ``weights`` overrides entries of ``DEFAULT_INDEX_WEIGHTS`` per index;
+    ``rank_by_period`` ranks signals within each period instead of across the
+    full history.
+    """
 
     key_cols = [c for c in enrol.columns if c not in {"age_0_5", "age_5_17", "age_18_greater", "enrol_total"}]
     value_cols = [c for c in enrol.columns if c.startswith("age_")] + ["enrol_total"]
 
-    combined = enrol.merge(demo, on=key_cols, how="outer", suffixes=("", "_demo"))
-    combined = combined.merge(bio, on=key_cols, how="outer", suffixes=("", "_bio"))
-    combined = combined.fillna(0)
+    with profiling.stage("merge", rows_in=len(enrol) + len(demo) + len(bio)) as rec:
+        combined = enrol.merge(demo, on=key_cols, how="outer", suffixes=("", "_demo"))
+        combined = combined.merge(bio, on=key_cols, how="outer", suffixes=("", "_bio"))
+        combined = combined.fillna(0)
+        rec["rows_out"] = len(combined)
 
     # Standard totals
     combined["enrol_total"] = combined.get("enrol_total", 0)
@@ -58,37 +163,19 @@ def compute_indices(enrol: pd.DataFrame, demo: pd.DataFrame, bio: pd.DataFrame)
 
     # Momentum terms (month-on-month growth and positive diffs)
     group_keys = [c for c in key_cols if c != "period"]
-    combined = combined.sort_values(["period", *group_keys])
-    combined["demo_mom"] = _group_pct_change(combined, group_keys, "demo_total")
-    combined["demo_positive_diff"] = _group_positive_diff(combined, group_keys, "demo_total")
-    combined["tx_load"] = combined["enrol_total"] + combined["demo_total"] + combined["bio_total"]
-
-    # Digital Inclusion Index (DII)
-    dii = (
-        0.4 * _pct_rank(combined["enrol_total"])
-        + 0.4 * _pct_rank(combined["demo_total"])
-        + 0.2 * _pct_rank(combined["demo_to_enrol"])
-    )
-    combined["digital_inclusion_index"] = (dii * 100).round(2)
-
-    # Migration Intensity Score (MIS)
-    mis = 0.6 * _pct_rank(combined["demo_to_enrol"]) + 0.4 * _pct_rank(combined["demo_positive_diff"])
-    combined["migration_intensity_score"] = (mis * 100).round(2)
-
-    # Aadhaar Service Stress Index (ASSI)
-    load_rank = _pct_rank(combined["tx_load"])
-    spike_signal = _pct_rank(combined.groupby(group_keys)["tx_load"].transform(lambda s: (s - s.mean()) / (s.std(ddof=0) + 1e-9)))
-    assi = 0.7 * load_rank + 0.3 * spike_signal
-    combined["service_stress_index"] = (assi * 100).round(2)
-
-    # Data Quality & Friction Index (DQFI) – higher implies more friction
-    rework_ratio = _safe_div(combined["demo_total"] + combined["bio_total"], combined["enrol_total"].replace(0, np.nan))
-    variability = combined.groupby(group_keys)["demo_total"].transform(lambda s: _safe_div(s.rolling(3, min_periods=1).std(), s.rolling(3, min_periods=1).mean() + 1e-9))
-    dqfi = 0.6 * _pct_rank(rework_ratio.fillna(0)) + 0.4 * _pct_rank(variability.fillna(0))
-    combined["data_quality_friction_index"] = (dqfi * 100).round(2)
-
-    # Biometric Failure Risk Score (BFRS)
-    bfrs = 0.6 * _pct_rank(combined["youth_bio_share"]) + 0.4 * _pct_rank(combined["bio_to_enrol"])
-    combined["biometric_failure_risk_score"] = (bfrs * 100).round(2)
+    with profiling.stage("momentum", rows_in=len(combined)):
+        combined = combined.sort_values(["period", *group_keys])
+        combined["demo_mom"] = _group_pct_change(combined, group_keys, "demo_total")
+        combined["demo_positive_diff"] = _group_positive_diff(combined, group_keys, "demo_total")
+        combined["tx_load"] = combined["enrol_total"] + combined["demo_total"] + combined["bio_total"]
+
+    # Composite indices: DII, MIS, ASSI, DQFI (higher = more friction), BFRS
+    with profiling.stage("signals", rows_in=len(combined)):
+        signals = _index_signals(combined, group_keys)
+    with profiling.stage("rank_blend", rows_in=len(signals)):
+        groups = combined["period"].to_numpy() if rank_by_period else None
+        indices = composite_indices(signals, weights=weights, groups=groups)
+    for name in indices.columns:
+        combined[name] = indices[name]
 
     return combined
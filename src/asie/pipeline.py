@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import List, Mapping, Optional, Sequence
 
 import pandas as pd
 
-from . import anomalies, data_loader, metrics
+from . import anomalies, data_loader, metrics, profiling, quality, reporting, rollups, snapshot
 
 
 DEFAULT_RAW = Path(__file__).resolve().parents[2] / "data" / "raw"
@@ -20,100 +20,140 @@ def run_pipeline(
     processed_root: Path | str = DEFAULT_PROCESSED,
     report_path: Path | str = DEFAULT_REPORT,
     anomaly_threshold: float = 3.0,
+    index_weights: Optional[Mapping[str, Mapping[str, float]]] = None,
+    rank_by_period: bool = False,
+    run_report_path: Path | str | None = None,
+    report_formats: Sequence[str] = ("md",),
+    geo_reports_dir: Path | str | None = None,
+    report_workers: Optional[int] = 1,
+    anomaly_methods: Sequence[str] = ("zscore",),
+    anomaly_joint_metrics: int = 0,
+    anomaly_workers: int = 1,
 ) -> None:
+    """Run ingestion, indices, anomalies and the summary report for one geo level.
+
+    The summary is written to ``report_path`` in each of ``report_formats``
+    (``md``, ``html``, ``json``). With ``geo_reports_dir`` set, one report per
+    state (district runs) or per district (pincode runs) is also rendered
+    there across ``report_workers`` processes.
+
+    Anomalies are scored per geography with each of ``anomaly_methods``
+    (see ``anomalies.METHODS``) into one table tagged by ``method``. With
+    ``anomaly_joint_metrics`` > 0, geo-periods where that many metrics
+    deviate together also get a ``joint`` row (off by default).
+    ``forecast_residual`` scores against the previous run's
+    ``forecast_<geo>.parquet`` where it covers new actuals.
+
+    Rows rejected during ingestion (bad dates, counts, geographies or
+    pincodes) and state/district names mapped to their canonical spelling
+    are summarized in ``<processed_root>/quality_<geo>_<freq>.json``.
+
+    Stage timings, row counts and peak RSS are written as JSON to
+    ``run_report_path`` (default: ``<processed_root>/run_report_<geo>_<freq>.json``).
+    """
     raw_root = Path(raw_root)
     processed_root = Path(processed_root)
     processed_root.mkdir(parents=True, exist_ok=True)
     Path(report_path).parent.mkdir(parents=True, exist_ok=True)
-
-    enrol = data_loader.load_enrolment(raw_root, freq=freq, geo_level=geo_level)
-    demo = data_loader.load_demographic(raw_root, freq=freq, geo_level=geo_level)
-    bio = data_loader.load_biometric(raw_root, freq=freq, geo_level=geo_level)
-
-    combined = metrics.compute_indices(enrol, demo, bio)
+    if run_report_path is None:
+        run_report_path = processed_root / f"run_report_{geo_level}_{freq}.json"
+
+    with profiling.run_report("pipeline", path=run_report_path, geo_level=geo_level, freq=freq):
+        _run_stages(
+            geo_level,
+            freq,
+            raw_root,
+            processed_root,
+            report_path,
+            anomaly_threshold,
+            index_weights,
+            rank_by_period,
+            report_formats,
+            geo_reports_dir,
+            report_workers,
+            anomaly_methods,
+            anomaly_joint_metrics,
+            anomaly_workers,
+        )
+
+
+def _run_stages(
+    geo_level: str,
+    freq: str,
+    raw_root: Path,
+    processed_root: Path,
+    report_path: Path | str,
+    anomaly_threshold: float,
+    index_weights: Optional[Mapping[str, Mapping[str, float]]],
+    rank_by_period: bool,
+    report_formats: Sequence[str],
+    geo_reports_dir: Path | str | None,
+    report_workers: Optional[int],
+    anomaly_methods: Sequence[str],
+    anomaly_joint_metrics: int,
+    anomaly_workers: int,
+) -> None:
+    report = quality.QualityReport()
+    with profiling.stage("load_enrolment") as rec:
+        enrol = data_loader.load_enrolment(raw_root, freq=freq, geo_level=geo_level, quality=report)
+        rec["rows_out"] = len(enrol)
+    with profiling.stage("load_demographic") as rec:
+        demo = data_loader.load_demographic(raw_root, freq=freq, geo_level=geo_level, quality=report)
+        rec["rows_out"] = len(demo)
+    with profiling.stage("load_biometric") as rec:
+        bio = data_loader.load_biometric(raw_root, freq=freq, geo_level=geo_level, quality=report)
+        rec["rows_out"] = len(bio)
+    report.write(processed_root / f"quality_{geo_level}_{freq}.json", root=raw_root)
+
+    with profiling.stage("compute_indices") as rec:
+        combined = metrics.compute_indices(enrol, demo, bio, weights=index_weights, rank_by_period=rank_by_period)
+        rec["rows_out"] = len(combined)
 
     # Save processed datasets
-    enrol.to_parquet(processed_root / f"enrolment_{geo_level}_{freq}.parquet", index=False)
-    demo.to_parquet(processed_root / f"demographic_{geo_level}_{freq}.parquet", index=False)
-    bio.to_parquet(processed_root / f"biometric_{geo_level}_{freq}.parquet", index=False)
-    combined.to_parquet(processed_root / f"metrics_{geo_level}_{freq}.parquet", index=False)
-
-    group_keys: List[str] = [c for c in combined.columns if c not in {"period", "enrol_total", "demo_total", "bio_total", "tx_load", "digital_inclusion_index", "migration_intensity_score", "service_stress_index", "data_quality_friction_index", "biometric_failure_risk_score"} and not c.endswith("share") and not c.endswith("ratio") and not c.endswith("index") and not c.endswith("score") and not c.endswith("_to_enrol") and not c.endswith("mom") and not c.endswith("diff")]
-    if "period" in group_keys:
-        group_keys.remove("period")
-
-    anomaly_df = anomalies.detect_anomalies(
-        combined,
-        value_cols=["enrol_total", "demo_total", "bio_total", "tx_load"],
-        group_keys=group_keys,
-        threshold=anomaly_threshold,
-    )
-    anomaly_df.to_parquet(processed_root / f"anomalies_{geo_level}_{freq}.parquet", index=False)
-
-    _write_summary(report_path, combined, anomaly_df, geo_level)
-
-
-def _top_table(df: pd.DataFrame, column: str, n: int = 5) -> pd.DataFrame:
-    cols = [c for c in df.columns if c not in {"period"} and not c.endswith("share") and not c.endswith("ratio") and not c.endswith("mom") and not c.endswith("diff")]
-    geo_cols = [c for c in cols if c not in {
-        column,
-        "enrol_total",
-        "demo_total",
-        "bio_total",
-        "tx_load",
-        "digital_inclusion_index",
-        "migration_intensity_score",
-        "service_stress_index",
-        "data_quality_friction_index",
-        "biometric_failure_risk_score",
-    }]
-    geo_cols = [c for c in geo_cols if c != "period"]
-    latest_period = df["period"].max()
-    latest = df.loc[df["period"] == latest_period]
-    return latest.sort_values(column, ascending=False)[[*geo_cols, column]].head(n)
-
-
-def _write_summary(report_path: Path | str, combined: pd.DataFrame, anomaly_df: pd.DataFrame, geo_level: str) -> None:
-    report_path = Path(report_path)
-    latest_period = combined["period"].max()
-
-    top_dii = _top_table(combined, "digital_inclusion_index")
-    top_mis = _top_table(combined, "migration_intensity_score")
-    top_assi = _top_table(combined, "service_stress_index")
-    top_dqfi = _top_table(combined, "data_quality_friction_index")
-    top_bfrs = _top_table(combined, "biometric_failure_risk_score")
-
-    lines = [
-        "# Aadhaar Societal Intelligence Engine (ASIE)\n",
-        f"Geo level: **{geo_level}** | Frequency: **{latest_period.to_period('M')}**\n",
-        "## Highlights (latest period)\n",
-        f"- Top Digital Inclusion Index: {top_dii.to_dict(orient='records')}\n",
-        f"- Top Migration Intensity Score: {top_mis.to_dict(orient='records')}\n",
-        f"- Top Service Stress Index: {top_assi.to_dict(orient='records')}\n",
-        f"- Highest Data Quality & Friction: {top_dqfi.to_dict(orient='records')}\n",
-        f"- Highest Biometric Failure Risk: {top_bfrs.to_dict(orient='records')}\n",
-        "\n## Anomalies\n",
-    ]
-
-    if anomaly_df.empty:
-        lines.append("No anomalies detected with current threshold.\n")
-    else:
-        recent_anoms = anomaly_df.sort_values("period", ascending=False).head(20)
-        lines.append(recent_anoms.to_markdown(index=False))
-        lines.append("\n")
-
-    lines.append("## Recommendations (state/district playbook)\n")
-    lines.extend(
-        [
-            "- **Digital Inclusion (high DII leaders):** Consolidate gains with self-service + assisted channels; replicate playbook in mid-tier regions.\n",
-            "- **Migration Intensity (high MIS):** Pre-position address/mobile update capacity; mobile camps in in-migration hotspots; multilingual comms.\n",
-            "- **Service Stress (high ASSI):** Add temporary staff/slots, monitor kit uptime, triage complex cases to assisted counters.\n",
-            "- **Data Friction (high DQFI):** Review exception codes/docs, simplify checklists, deploy senior resolver at centers with repeated rework.\n",
-            "- **Biometric Risk (high BFRS):** Prioritize iris/face capture for youth/elderly; refresh/maintain devices; schedule proactive recapture drives.\n",
-        ]
-    )
-
-    report_path.write_text("\n".join(lines), encoding="utf-8")
+    with profiling.stage("write_parquet"):
+        enrol.to_parquet(processed_root / f"enrolment_{geo_level}_{freq}.parquet", index=False)
+        demo.to_parquet(processed_root / f"demographic_{geo_level}_{freq}.parquet", index=False)
+        bio.to_parquet(processed_root / f"biometric_{geo_level}_{freq}.parquet", index=False)
+        combined.to_parquet(processed_root / f"metrics_{geo_level}_{freq}.parquet", index=False)
+
+    if geo_level != "state":
+        # National/state rollups and quantile sketches over the sub-state rows
+        with profiling.stage("write_rollups", rows_in=len(combined)):
+            rollups.write_rollups(combined, processed_root, geo_level, freq=freq)
+
+    # Score each geography's own series; the age-band columns are values, not keys
+    group_keys: List[str] = data_loader._geo_cols_for_level(geo_level)
+
+    params = {}
+    forecast_path = processed_root / f"forecast_{geo_level}.parquet"
+    if "forecast_residual" in anomaly_methods and forecast_path.exists():
+        params["forecast_residual"] = {"forecast": pd.read_parquet(forecast_path)}
+
+    with profiling.stage("detect_anomalies", rows_in=len(combined)) as rec:
+        anomaly_df = anomalies.detect_anomalies(
+            combined,
+            value_cols=["enrol_total", "demo_total", "bio_total", "tx_load"],
+            group_keys=group_keys,
+            threshold=anomaly_threshold,
+            method=anomaly_methods,
+            params=params,
+            joint_min_metrics=anomaly_joint_metrics,
+            workers=anomaly_workers,
+        )
+        rec["rows_out"] = len(anomaly_df)
+    anomalies.write_anomalies(anomaly_df, processed_root / f"anomalies_{geo_level}_{freq}.parquet", anomaly_methods)
+
+    with profiling.stage("write_summary"):
+        reporting.write_summary(report_path, combined, anomaly_df, geo_level, formats=report_formats)
+    if geo_reports_dir is not None:
+        with profiling.stage("write_geo_reports") as rec:
+            written = reporting.write_geo_reports(
+                geo_reports_dir, combined, anomaly_df, geo_level, formats=report_formats, workers=report_workers
+            )
+            rec["rows_out"] = len(written)
+
+    with profiling.stage("write_snapshot"):
+        snapshot.write_snapshot(processed_root)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_current: contextvars.ContextVar[Optional["RunReport"]] = contextvars.ContextVar("asie_run_report", default=None)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class RunReport:
+    """Per-stage timings, row counts and peak RSS for one pipeline run."""
+
+    def __init__(self, name: str, **meta: Any):
+        self.name = name
+        self.meta = meta
+        self.stages: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+        self._started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        full_name = "/".join([*self._stack, name])
+        rec: Dict[str, Any] = {"stage": full_name}
+        if rows_in is not None:
+            rec["rows_in"] = int(rows_in)
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            self._stack.pop()
+            rec["seconds"] = round(time.perf_counter() - start, 4)
+            rec["peak_rss_mb"] = peak_rss_mb()
+            self.stages.append(rec)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.name,
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._started, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "python": platform.python_version(),
+            **self.meta,
+            "stages": self.stages,
+        }
+
+    def write(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        return path
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Record a stage on the active run report; a no-op when none is active.
+
+    Callers may set ``rec["rows_out"]`` (or other counters) on the yielded dict.
+    """
+    report = _current.get()
+    if report is None:
+        yield {}
+        return
+    with report.stage(name, rows_in=rows_in) as rec:
+        yield rec
+
+
+def current_report() -> Optional[RunReport]:
+    return _current.get()
+
+
+@contextmanager
+def run_report(name: str, path: Path | str | None = None, **meta: Any) -> Iterator[RunReport]:
+    """Activate a ``RunReport`` for nested ``stage`` calls; write JSON to ``path`` on exit.
+
+    When a report is already active (e.g. forecasts inside a larger run), the
+    stages are recorded on it and nothing extra is written.
+    """
+    active = _current.get()
+    if active is not None:
+        with active.stage(name):
+            yield active
+        return
+    report = RunReport(name, **meta)
+    token = _current.set(report)
+    try:
+        yield report
+    finally:
+        _current.reset(token)
+        if path is not None:
+            report.write(path)
+
+
+def profile_call(func: Callable[[], Any], out_path: Path | str, tool: str = "cprofile") -> Any:
+    """Run ``func`` under cProfile (``.prof`` dump) or pyinstrument (``.html``)."""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if tool == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as exc:
+            raise RuntimeError("pyinstrument is not installed; pip install pyinstrument") from exc
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return func()
+        finally:
+            profiler.stop()
+            out_path.write_text(profiler.output_html(), encoding="utf-8")
+    if tool != "cprofile":
+        raise ValueError("tool must be one of: cprofile, pyinstrument")
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(str(out_path))
+
+
+def add_profile_args(parser) -> None:
+    """Shared ``--profile`` / ``--profile-tool`` flags for the ``scripts/`` entry points."""
+    parser.add_argument("--profile", metavar="PATH", help="Write a profiler dump (cProfile .prof or pyinstrument .html)")
+    parser.add_argument("--profile-tool", choices=["cprofile", "pyinstrument"], default="cprofile")
+
+
+def run_maybe_profiled(func: Callable[[], Any], args) -> Any:
+    if getattr(args, "profile", None):
+        result = profile_call(func, args.profile, tool=args.profile_tool)
+        print(f"Profile written to {args.profile}")
+        return result
+    return func()
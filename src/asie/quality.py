@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LOOKUP = Path(__file__).resolve().parents[2] / "data" / "reference" / "geo_lookup.csv"
+# Rows are daily per-pincode counts; national monthly per-pincode maxima are in the low thousands
+MAX_COUNT = 100_000
+# Rejected rows kept per file and reason for inspection
+SAMPLE_ROWS = 5
+# Indian PIN codes: six digits, first digit 1-9
+PINCODE_PATTERN = r"[1-9]\d{5}"
+REJECT_REASONS = [
+    "bad_date",
+    "non_numeric_count",
+    "fractional_count",
+    "negative_count",
+    "absurd_count",
+    "bad_state",
+    "bad_district",
+    "bad_pincode",
+]
+
+
+def name_key(values: pd.Series) -> pd.Series:
+    """Case-, spacing- and punctuation-insensitive key ("West  Bengal", "WESTBENGAL" -> "westbengal")."""
+    return (
+        values.astype("string")
+        .str.lower()
+        .str.replace("&", "and", regex=False)
+        .str.replace(r"[^a-z0-9]", "", regex=True)
+        .fillna("")
+    )
+
+
+def clean_name(values: pd.Series) -> pd.Series:
+    """Display form for names missing from the lookup: no stray ``*``, single spaces, title case if shouted."""
+    cleaned = values.astype("string").str.replace("*", "", regex=False).str.split().str.join(" ")
+    shouted = (cleaned.str.isupper() | cleaned.str.islower()).fillna(False)
+    return cleaned.where(~shouted, cleaned.str.title())
+
+
+class GeoLookup:
+    """Canonical state and district names keyed by :func:`name_key`.
+
+    The lookup CSV has ``level,state,name,canonical`` rows: ``state`` rows
+    map a spelling to a canonical state; ``district`` rows map a spelling
+    within a (canonical) state to a canonical district. Spellings that only
+    differ in case, spacing or punctuation share a key, so one row covers
+    all of them.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        states = table[table["level"] == "state"]
+        districts = table[table["level"] == "district"]
+        self.states: Dict[str, str] = dict(zip(name_key(states["name"]), states["canonical"]))
+        self.districts: Dict[Tuple[str, str], str] = dict(
+            zip(zip(name_key(districts["state"]), name_key(districts["name"])), districts["canonical"])
+        )
+
+    @classmethod
+    def empty(cls) -> "GeoLookup":
+        return cls(pd.DataFrame(columns=["level", "state", "name", "canonical"]))
+
+    def resolve_states(self, names: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Canonical name and matched-in-lookup flag for each of ``names`` (distinct spellings)."""
+        found = name_key(names).map(self.states)
+        return found.fillna(clean_name(names)).to_numpy(dtype=object), found.notna().to_numpy()
+
+    def resolve_districts(self, states: np.ndarray, names: pd.Series) -> np.ndarray:
+        """Canonical district for each (canonical state, spelling) pair."""
+        keys = zip(name_key(pd.Series(states, dtype="string")), name_key(names))
+        found = pd.Series([self.districts.get(k) for k in keys], dtype="string")
+        return found.fillna(clean_name(names.reset_index(drop=True))).to_numpy(dtype=object)
+
+
+def _distinct(values: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    """Codes into, and the distinct values of, ``values`` (NA kept as a value); string work runs on the latter."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes, pd.Series(uniques, dtype="string")
+
+
+def _take(distinct: pd.Series, codes: np.ndarray, index: pd.Index) -> pd.Series:
+    """Broadcast per-distinct values back to rows without re-boxing every string."""
+    return pd.Series(distinct.array.take(codes), index=index)
+
+
+def _has_letters(names: pd.Series) -> np.ndarray:
+    return name_key(names).str.contains("[a-z]", regex=True).to_numpy(dtype=bool)
+
+
+@lru_cache(maxsize=4)
+def load_lookup(path: Path | str = DEFAULT_LOOKUP) -> GeoLookup:
+    path = Path(path)
+    if not path.exists():
+        return GeoLookup.empty()
+    return GeoLookup(pd.read_csv(path, dtype="string", keep_default_na=False))
+
+
+def _sample(chunk: pd.DataFrame, rows: np.ndarray, first_line: int) -> List[Dict[str, Any]]:
+    out = []
+    for i in rows:
+        record = {"line": int(first_line + i + 2)}
+        record.update({c: (None if pd.isna(v) else str(v)) for c, v in chunk.iloc[i].items()})
+        out.append(record)
+    return out
+
+
+class QualityReport:
+    """Per-file rejection counts, rejected-row samples and name fixes collected during ingestion.
+
+    :meth:`validate` is applied to each CSV chunk inside the aggregation
+    pass, so checks cost no extra read. Every check is a vectorized mask; a
+    row failing several checks is counted under each reason but rejected once.
+    """
+
+    def __init__(self, lookup: Optional[GeoLookup] = None, max_count: float = MAX_COUNT, sample_rows: int = SAMPLE_ROWS):
+        self.lookup = lookup if lookup is not None else load_lookup()
+        self.max_count = max_count
+        self.sample_rows = sample_rows
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.renamed: Dict[str, Counter] = {"state": Counter(), "district": Counter()}
+        self.unmatched_states: Counter = Counter()
+
+    def _file(self, file: str) -> Dict[str, Any]:
+        return self.files.setdefault(file, {"rows_read": 0, "rows_kept": 0, "rejected": Counter(), "samples": {}})
+
+    def validate(
+        self, chunk: pd.DataFrame, file: str, first_line: int, value_cols: Sequence[str], date_format: str
+    ) -> pd.DataFrame:
+        """Drop invalid rows of ``chunk`` and return the rest with parsed dates, numeric counts and canonical names.
+
+        ``first_line`` is the number of data rows of ``file`` before this
+        chunk, used to report CSV line numbers in samples.
+        """
+        dates = pd.to_datetime(chunk["date"], format=date_format, errors="coerce")
+        counts = chunk[list(value_cols)].apply(pd.to_numeric, errors="coerce")
+        masks = {
+            "bad_date": dates.isna(),
+            "non_numeric_count": (counts.isna() & chunk[list(value_cols)].notna()).any(axis=1),
+            "fractional_count": (counts.notna() & (counts != counts.round())).any(axis=1),
+            "negative_count": (counts < 0).any(axis=1),
+            "absurd_count": (counts > self.max_count).any(axis=1),
+        }
+        state_codes, states = _distinct(chunk["state"])
+        masks["bad_state"] = ~_has_letters(states)[state_codes]
+        if "district" in chunk.columns:
+            district_codes, districts = _distinct(chunk["district"])
+            masks["bad_district"] = ~_has_letters(districts)[district_codes]
+        if "pincode" in chunk.columns:
+            pin_codes, pins = _distinct(chunk["pincode"])
+            stripped = pins.str.strip()
+            masks["bad_pincode"] = ~stripped.str.fullmatch(PINCODE_PATTERN).fillna(False).to_numpy(dtype=bool)[pin_codes]
+
+        stats = self._file(file)
+        rejected = np.zeros(len(chunk), dtype=bool)
+        for reason, mask in masks.items():
+            mask = np.asarray(mask, dtype=bool)
+            hits = int(mask.sum())
+            if not hits:
+                continue
+            rejected |= mask
+            stats["rejected"][reason] += hits
+            samples = stats["samples"].setdefault(reason, [])
+            room = self.sample_rows - len(samples)
+            if room > 0:
+                samples.extend(_sample(chunk, np.flatnonzero(mask)[:room], first_line))
+        stats["rows_read"] += len(chunk)
+        stats["rows_kept"] += int((~rejected).sum())
+
+        keep = ~rejected
+        out = chunk.loc[keep].copy()
+        out["date"] = dates[keep]
+        out[list(value_cols)] = counts[keep]
+        if "pincode" in out.columns:
+            out["pincode"] = _take(stripped.astype(str), pin_codes[keep], out.index)
+
+        # Names are resolved per distinct spelling and broadcast back through the codes
+        canonical, matched = self.lookup.resolve_states(states)
+        state_codes = state_codes[keep]
+        out["state"] = _take(pd.Series(canonical, dtype="string"), state_codes, out.index)
+        rows = np.bincount(state_codes, minlength=len(states))
+        for i in np.flatnonzero(rows):
+            if states[i] != canonical[i]:
+                self.renamed["state"][(states[i], canonical[i])] += int(rows[i])
+            if not matched[i]:
+                self.unmatched_states[canonical[i]] += int(rows[i])
+        if "district" in out.columns:
+            pairs, inverse = np.unique(
+                state_codes.astype(np.int64) * len(districts) + district_codes[keep], return_inverse=True
+            )
+            state_idx, district_idx = np.divmod(pairs, len(districts))
+            names = districts.iloc[district_idx]
+            resolved = self.lookup.resolve_districts(canonical[state_idx], names)
+            out["district"] = _take(pd.Series(resolved, dtype="string"), inverse.ravel(), out.index)
+            rows = np.bincount(inverse.ravel(), minlength=len(pairs))
+            for j, name in enumerate(names):
+                if name != resolved[j]:
+                    self.renamed["district"][(canonical[state_idx[j]], name, resolved[j])] += int(rows[j])
+        return out
+
+    def to_dict(self, root: Path | str | None = None) -> Dict[str, Any]:
+        files = {}
+        totals: Dict[str, Any] = {"rows_read": 0, "rows_kept": 0, "rejected": Counter()}
+        for file, stats in self.files.items():
+            name = os.path.relpath(file, root) if root is not None else file
+            files[name] = {**stats, "rejected": {r: stats["rejected"][r] for r in REJECT_REASONS if stats["rejected"][r]}}
+            totals["rows_read"] += stats["rows_read"]
+            totals["rows_kept"] += stats["rows_kept"]
+            totals["rejected"].update(stats["rejected"])
+        totals["rejected"] = {r: totals["rejected"][r] for r in REJECT_REASONS if totals["rejected"][r]}
+        renamed_states = [{"from": k[0], "to": k[1], "rows": n} for k, n in self.renamed["state"].most_common()]
+        renamed_districts = [
+            {"state": k[0], "from": k[1], "to": k[2], "rows": n} for k, n in self.renamed["district"].most_common()
+        ]
+        return {
+            "totals": totals,
+            "files": files,
+            "renamed": {"state": renamed_states, "district": renamed_districts},
+            "unmatched_states": [{"state": k, "rows": n} for k, n in self.unmatched_states.most_common()],
+        }
+
+    def write(self, path: Path | str, root: Path | str | None = None) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(root), indent=2, default=str), encoding="utf-8")
+        return path
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+GEO_COLUMNS = ["state", "district", "pincode"]
+# (index column, highlight heading), in report order
+HIGHLIGHTS: List[Tuple[str, str]] = [
+    ("digital_inclusion_index", "Top Digital Inclusion Index"),
+    ("migration_intensity_score", "Top Migration Intensity Score"),
+    ("service_stress_index", "Top Service Stress Index"),
+    ("data_quality_friction_index", "Highest Data Quality & Friction"),
+    ("biometric_failure_risk_score", "Highest Biometric Failure Risk"),
+]
+RECOMMENDATIONS = [
+    "**Digital Inclusion (high DII leaders):** Consolidate gains with self-service + assisted channels; replicate playbook in mid-tier regions.",
+    "**Migration Intensity (high MIS):** Pre-position address/mobile update capacity; mobile camps in in-migration hotspots; multilingual comms.",
+    "**Service Stress (high ASSI):** Add temporary staff/slots, monitor kit uptime, triage complex cases to assisted counters.",
+    "**Data Friction (high DQFI):** Review exception codes/docs, simplify checklists, deploy senior resolver at centers with repeated rework.",
+    "**Biometric Risk (high BFRS):** Prioritize iris/face capture for youth/elderly; refresh/maintain devices; schedule proactive recapture drives.",
+]
+FORMATS = {"md": "md", "markdown": "md", "html": "html", "json": "json"}
+# Geography each report fan-out splits by, per pipeline geo level
+FANOUT_KEYS: Dict[str, List[str]] = {"state": ["state"], "district": ["state"], "pincode": ["state", "district"]}
+
+MARKDOWN_TEMPLATE = Template(
+    """# $title
+
+Geo level: **$geo_level** | Frequency: **$period**$scope
+
+## Highlights (latest period)
+
+$highlights
+## Anomalies
+
+$anomalies
+
+## Recommendations (state/district playbook)
+
+$recommendations
+"""
+)
+
+HTML_TEMPLATE = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+body { font-family: system-ui, sans-serif; margin: 2rem; color: #1f2937; }
+table { border-collapse: collapse; margin-bottom: 1.5rem; }
+th, td { border: 1px solid #d1d5db; padding: 0.25rem 0.6rem; text-align: left; }
+th { background: #f3f4f6; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<p>Geo level: <strong>$geo_level</strong> | Frequency: <strong>$period</strong>$scope</p>
+<h2>Highlights (latest period)</h2>
+$highlights
+<h2>Anomalies</h2>
+$anomalies
+<h2>Recommendations (state/district playbook)</h2>
+<ul>
+$recommendations
+</ul>
+</body>
+</html>
+"""
+)
+
+
+def geo_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in GEO_COLUMNS if c in df.columns]
+
+
+def latest_rows(df: pd.DataFrame, by: Optional[List[str]] = None) -> pd.DataFrame:
+    """Rows of the latest period, overall or per ``by`` group."""
+    if not by:
+        return df.loc[df["period"] == df["period"].max()]
+    return df.loc[df["period"] == df.groupby(by, sort=False)["period"].transform("max")]
+
+
+def top_tables(df: pd.DataFrame, metrics: Sequence[str], n: int = 5) -> Dict[str, pd.DataFrame]:
+    """Top-``n`` rows of the latest period for every metric, from one filtered frame.
+
+    The latest period is selected once; each metric then costs a
+    ``np.partition`` plus a sort of only ``n`` values instead of a full sort.
+    NaN values never rank.
+    """
+    geo_cols = geo_columns(df)
+    latest = latest_rows(df)
+    out: Dict[str, pd.DataFrame] = {}
+    for metric in metrics:
+        if metric not in latest.columns:
+            continue
+        values = latest[metric].to_numpy(dtype=float)
+        ranked = np.where(np.isnan(values), -np.inf, values)
+        k = min(n, int((~np.isnan(values)).sum()))
+        if k == 0:
+            out[metric] = latest.iloc[:0][[*geo_cols, metric]]
+            continue
+        cutoff = -np.partition(-ranked, k - 1)[k - 1]
+        above = np.flatnonzero(ranked > cutoff)
+        # Ties at the cut-off keep their first occurrences, like nlargest(keep="first")
+        top = np.concatenate([above, np.flatnonzero(ranked == cutoff)[: k - len(above)]])
+        top = top[np.lexsort((top, -ranked[top]))]
+        out[metric] = latest.iloc[top][[*geo_cols, metric]].reset_index(drop=True)
+    return out
+
+
+def grouped_top_tables(df: pd.DataFrame, metrics: Sequence[str], by: List[str], n: int = 5) -> Dict[str, pd.DataFrame]:
+    """Top-``n`` latest-period rows per ``by`` group for every metric.
+
+    One stable sort per metric over the latest rows of all groups, then
+    ``groupby().head(n)``, instead of filtering and sorting each group.
+    """
+    geo_cols = geo_columns(df)
+    latest = latest_rows(df, by)
+    out: Dict[str, pd.DataFrame] = {}
+    for metric in metrics:
+        if metric not in latest.columns:
+            continue
+        ranked = latest[[*geo_cols, metric]].dropna(subset=[metric])
+        ranked = ranked.sort_values([*by, metric], ascending=[True] * len(by) + [False], kind="mergesort")
+        out[metric] = ranked.groupby(by, sort=False).head(n)
+    return out
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return json.loads(df.to_json(orient="records"))
+
+
+def _anomaly_records(anomaly_df: pd.DataFrame, max_anomalies: int) -> List[Dict[str, Any]]:
+    if anomaly_df.empty:
+        return []
+    cols = ["period", *geo_columns(anomaly_df), "metric", "zscore", "direction", "method"]
+    if "method" in anomaly_df.columns:
+        # Most recent rows per method, so one method's volume cannot crowd out the others
+        recent = pd.concat(
+            [group.nlargest(max_anomalies, "period") for _, group in anomaly_df.groupby("method", sort=True)]
+        )
+    else:
+        recent = anomaly_df.nlargest(max_anomalies, "period")
+    recent = recent[[c for c in cols if c in recent.columns]]
+    return _records(recent.assign(period=recent["period"].dt.strftime("%Y-%m"), zscore=recent["zscore"].round(2)))
+
+
+def _context(
+    geo_level: str,
+    period: Optional[pd.Timestamp],
+    highlights: List[Dict[str, Any]],
+    anomalies: List[Dict[str, Any]],
+    scope: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    return {
+        "title": "Aadhaar Societal Intelligence Engine (ASIE)",
+        "geo_level": geo_level,
+        "period": period.strftime("%Y-%m") if period is not None and not pd.isna(period) else None,
+        "scope": scope or {},
+        "highlights": highlights,
+        "anomalies": anomalies,
+        "recommendations": RECOMMENDATIONS,
+    }
+
+
+def build_context(
+    combined: pd.DataFrame,
+    anomaly_df: pd.DataFrame,
+    geo_level: str,
+    n: int = 5,
+    max_anomalies: int = 20,
+) -> Dict[str, Any]:
+    """Everything a report template renders, as plain JSON-able data."""
+    tables = top_tables(combined, [metric for metric, _ in HIGHLIGHTS], n=n)
+    highlights = [
+        {"metric": metric, "heading": heading, "rows": _records(tables[metric])}
+        for metric, heading in HIGHLIGHTS
+        if metric in tables
+    ]
+    return _context(geo_level, combined["period"].max(), highlights, _anomaly_records(anomaly_df, max_anomalies))
+
+
+def build_scope_contexts(
+    combined: pd.DataFrame,
+    anomaly_df: pd.DataFrame,
+    geo_level: str,
+    by: List[str],
+    n: int = 5,
+    max_anomalies: int = 20,
+) -> Dict[Tuple, Dict[str, Any]]:
+    """Report contexts for every ``by`` group, from one pass per metric over the whole frame."""
+    tables = grouped_top_tables(combined, [metric for metric, _ in HIGHLIGHTS], by, n=n)
+    rows: Dict[Tuple, Dict[str, List[Dict[str, Any]]]] = {}
+    for metric, table in tables.items():
+        records = _records(table)
+        for record in records:
+            rows.setdefault(tuple(record[k] for k in by), {}).setdefault(metric, []).append(record)
+    periods = combined.groupby(by, sort=True)["period"].max()
+    anomaly_groups = dict(tuple(anomaly_df.groupby(by, sort=False))) if not anomaly_df.empty else {}
+    contexts = {}
+    for key, period in periods.items():
+        key = key if isinstance(key, tuple) else (key,)
+        found = rows.get(key, {})
+        highlights = [
+            {"metric": metric, "heading": heading, "rows": found.get(metric, [])}
+            for metric, heading in HIGHLIGHTS
+            if metric in tables
+        ]
+        anomalies = _anomaly_records(anomaly_groups.get(key, anomaly_df.iloc[:0]), max_anomalies)
+        contexts[key] = _context(geo_level, period, highlights, anomalies, scope=dict(zip(by, key)))
+    return contexts
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def _md_table(rows: List[Dict[str, Any]]) -> str:
+    columns = list(rows[0])
+    lines = ["| " + " | ".join(columns) + " |", "|" + "|".join("---" for _ in columns) + "|"]
+    lines += ["| " + " | ".join(_cell(row[c]).replace("|", "\\|") for c in columns) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def _html_table(rows: List[Dict[str, Any]]) -> str:
+    columns = list(rows[0])
+    head = "".join(f"<th>{html.escape(c)}</th>" for c in columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(_cell(row[c]))}</td>" for c in columns) + "</tr>\n" for row in rows
+    )
+    return f"<table>\n<tr>{head}</tr>\n{body}</table>"
+
+
+def _scope_label(scope: Dict[str, str]) -> str:
+    return ", ".join(f"{key}: {value}" for key, value in scope.items())
+
+
+def render_markdown(ctx: Dict[str, Any]) -> str:
+    highlights = "".join(
+        f"### {h['heading']}\n\n{_md_table(h['rows']) if h['rows'] else 'No data.'}\n\n" for h in ctx["highlights"]
+    )
+    return MARKDOWN_TEMPLATE.substitute(
+        title=ctx["title"],
+        geo_level=ctx["geo_level"],
+        period=ctx["period"],
+        scope=f" | Scope: **{_scope_label(ctx['scope'])}**" if ctx["scope"] else "",
+        highlights=highlights,
+        anomalies=_md_table(ctx["anomalies"]) if ctx["anomalies"] else "No anomalies detected with current threshold.",
+        recommendations="\n".join(f"- {rec}" for rec in ctx["recommendations"]),
+    )
+
+
+def render_html(ctx: Dict[str, Any]) -> str:
+    def _rec(text: str) -> str:
+        # Recommendations carry **bold** lead-ins from the Markdown report
+        return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", html.escape(text))
+
+    highlights = "\n".join(
+        f"<h3>{html.escape(h['heading'])}</h3>\n{_html_table(h['rows']) if h['rows'] else '<p>No data.</p>'}"
+        for h in ctx["highlights"]
+    )
+    return HTML_TEMPLATE.substitute(
+        title=html.escape(ctx["title"]),
+        geo_level=html.escape(ctx["geo_level"]),
+        period=html.escape(str(ctx["period"])),
+        scope=f" | Scope: <strong>{html.escape(_scope_label(ctx['scope']))}</strong>" if ctx["scope"] else "",
+        highlights=highlights,
+        anomalies=_html_table(ctx["anomalies"]) if ctx["anomalies"] else "<p>No anomalies detected with current threshold.</p>",
+        recommendations="\n".join(f"<li>{_rec(rec)}</li>" for rec in ctx["recommendations"]),
+    )
+
+
+def render_json(ctx: Dict[str, Any]) -> str:
+    return json.dumps(ctx, indent=1)
+
+
+RENDERERS = {"md": render_markdown, "html": render_html, "json": render_json}
+
+
+def write_report(ctx: Dict[str, Any], path: Path | str, formats: Sequence[str] = ("md",)) -> List[Path]:
+    """Write ``ctx`` once per format; ``path``'s suffix is replaced by each format's extension."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt in formats:
+        ext = FORMATS.get(fmt)
+        if ext is None:
+            raise ValueError(f"report format must be one of: {', '.join(FORMATS)}")
+        target = path.with_suffix(f".{ext}")
+        target.write_text(RENDERERS[ext](ctx), encoding="utf-8")
+        written.append(target)
+    return written
+
+
+def write_summary(
+    report_path: Path | str,
+    combined: pd.DataFrame,
+    anomaly_df: pd.DataFrame,
+    geo_level: str,
+    formats: Sequence[str] = ("md",),
+    n: int = 5,
+) -> List[Path]:
+    return write_report(build_context(combined, anomaly_df, geo_level, n=n), report_path, formats)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(value).lower()).strip("_") or "na"
+
+
+def _write_scope_report(job: Tuple[Dict[str, Any], str, Sequence[str]]) -> List[str]:
+    ctx, path, formats = job
+    return [str(p) for p in write_report(ctx, path, formats)]
+
+
+def write_geo_reports(
+    out_dir: Path | str,
+    combined: pd.DataFrame,
+    anomaly_df: pd.DataFrame,
+    geo_level: str,
+    formats: Sequence[str] = ("md",),
+    n: int = 5,
+    workers: Optional[int] = 1,
+) -> List[Path]:
+    """One report per parent geography (per state for states and districts, per district for pincodes).
+
+    All top-N tables are computed in one grouped pass; rendering and writing
+    the files is then fanned out over ``workers`` processes (``None`` = CPU
+    count, ``1`` = inline, which is faster for a few hundred reports). Files
+    go to ``out_dir/<geo_level>/<state>[/<district>].<ext>``.
+    """
+    if geo_level not in FANOUT_KEYS:
+        raise ValueError(f"geo_level must be one of: {', '.join(FANOUT_KEYS)}")
+    keys = FANOUT_KEYS[geo_level]
+    contexts = build_scope_contexts(combined, anomaly_df, geo_level, keys, n=n)
+    jobs = []
+    taken: Dict[Path, int] = {}
+    for key, ctx in contexts.items():
+        path = Path(out_dir, geo_level, *[_slug(k) for k in key])
+        # Spelling variants of one name (e.g. case) slug alike; keep each report
+        taken[path] = taken.get(path, 0) + 1
+        if taken[path] > 1:
+            path = path.with_name(f"{path.name}_{taken[path]}")
+        jobs.append((ctx, str(path.with_suffix(".md")), tuple(formats)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        written = [p for job in jobs for p in _write_scope_report(job)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = [p for paths in pool.map(_write_scope_report, jobs, chunksize=32) for p in paths]
+    return [Path(p) for p in written]
+
+
+def add_report_args(parser) -> None:
+    """Shared report flags for the ``scripts/`` pipeline entry points."""
+    parser.add_argument("--formats", nargs="+", choices=["md", "html", "json"], default=["md"], help="Summary report formats")
+    parser.add_argument("--geo-reports", metavar="DIR", help="Also write one report per state/district into DIR")
+    parser.add_argument("--report-workers", type=int, default=1, help="Processes for --geo-reports (0 = CPU count)")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .metrics import DEFAULT_INDEX_WEIGHTS
+from .sketches import BucketMapping, QuantileSketch
+
+COUNT_COLUMNS = ["enrol_total", "demo_total", "bio_total", "tx_load"]
+INDEX_COLUMNS = list(DEFAULT_INDEX_WEIGHTS)
+# Grouping keys of each precomputed rollup
+ROLLUP_KEYS: Dict[str, List[str]] = {"period": ["period"], "state": ["state"], "period_state": ["period", "state"]}
+# Indices are bounded 0-100, so fixed 0.1-wide buckets give an absolute bound;
+# unbounded volumes use log buckets with a 1% relative bound
+SKETCH_MAPPINGS: Dict[str, BucketMapping] = {
+    **{col: BucketMapping("linear", lo=0.0, hi=100.0, width=0.1) for col in INDEX_COLUMNS},
+    **{col: BucketMapping("log", alpha=0.01) for col in COUNT_COLUMNS},
+}
+
+
+def rollup_path(processed_root: Path | str, geo_level: str, by: str, freq: str = "M") -> Path:
+    return Path(processed_root) / f"rollup_{geo_level}_{by}_{freq}.parquet"
+
+
+def sketch_path(processed_root: Path | str, geo_level: str, freq: str = "M") -> Path:
+    return Path(processed_root) / f"sketch_{geo_level}_{freq}.parquet"
+
+
+def rollup(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Volume sums and index mean/min/max over the rows of each group, plus the row count ``geos``."""
+    keys = ROLLUP_KEYS[by]
+    grouped = df.groupby(keys, observed=True, sort=True)
+    counts = [c for c in COUNT_COLUMNS if c in df.columns]
+    indices = [c for c in INDEX_COLUMNS if c in df.columns]
+    stats = grouped[indices].agg(["mean", "min", "max"])
+    stats.columns = [f"{col}_{stat}" for col, stat in stats.columns]
+    out = pd.concat([grouped.size().rename("geos"), grouped[counts].sum().add_suffix("_sum"), stats.round(4)], axis=1)
+    return out.reset_index()
+
+
+def sketch_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Long table of (period, state, metric, bucket, count) sketch buckets.
+
+    Each (period, state, metric) slice is a ``QuantileSketch`` over the
+    sub-state rows; slices merge by summing counts per bucket.
+    """
+    parts = []
+    for metric, mapping in SKETCH_MAPPINGS.items():
+        if metric not in df.columns:
+            continue
+        values = df[metric]
+        valid = values.notna()
+        part = pd.DataFrame(
+            {
+                "period": df.loc[valid, "period"].to_numpy(),
+                "state": df.loc[valid, "state"].to_numpy(),
+                "bucket": mapping.keys(values[valid].to_numpy()),
+            }
+        )
+        part = part.groupby(["period", "state", "bucket"], sort=True).size().rename("count").reset_index()
+        part.insert(2, "metric", metric)
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=["period", "state", "metric", "bucket", "count"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def write_rollups(df: pd.DataFrame, processed_root: Path | str, geo_level: str, freq: str = "M") -> List[Path]:
+    """Write the rollups and the sketch table for a sub-state metrics frame."""
+    written = []
+    for by in ROLLUP_KEYS:
+        path = rollup_path(processed_root, geo_level, by, freq)
+        rollup(df, by).to_parquet(path, index=False)
+        written.append(path)
+    path = sketch_path(processed_root, geo_level, freq)
+    sketch_table(df).to_parquet(path, index=False)
+    written.append(path)
+    return written
+
+
+def load_sketch(
+    table: pd.DataFrame, metric: str, period: Optional[pd.Timestamp] = None, state: Optional[str] = None
+) -> QuantileSketch:
+    """Merge the stored sketches for ``metric``, optionally limited to one period and/or state."""
+    mask = table["metric"] == metric
+    if period is not None:
+        mask &= table["period"] == period
+    if state is not None:
+        mask &= table["state"].str.lower() == state.lower()
+    rows = table.loc[mask]
+    return QuantileSketch.from_buckets(SKETCH_MAPPINGS[metric], rows["bucket"].to_numpy(), rows["count"].to_numpy())
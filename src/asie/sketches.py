@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+# Key of the bucket holding zeros (and clipped negatives) in log mappings
+ZERO_KEY = np.iinfo(np.int32).min
+
+
+@dataclass(frozen=True)
+class BucketMapping:
+    """Maps values to integer bucket keys and back to a representative value.
+
+    ``linear`` buckets have a fixed ``width`` over ``[lo, hi]`` (values outside
+    are clipped to the edge buckets); a representative is off by at most
+    ``width / 2``. ``log`` buckets grow geometrically as in DDSketch, so every
+    positive value is represented within a relative error of ``alpha``; zeros
+    and negatives share one bucket represented by 0.
+    """
+
+    kind: str
+    lo: float = 0.0
+    hi: float = 100.0
+    width: float = 0.1
+    alpha: float = 0.01
+
+    @property
+    def gamma(self) -> float:
+        return (1 + self.alpha) / (1 - self.alpha)
+
+    def keys(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if self.kind == "linear":
+            last = int(np.ceil((self.hi - self.lo) / self.width)) - 1
+            return np.clip(np.floor((values - self.lo) / self.width), 0, last).astype(np.int32)
+        positive = values > 0
+        keys = np.full(values.shape, ZERO_KEY, dtype=np.int32)
+        keys[positive] = np.ceil(np.log(values[positive]) / np.log(self.gamma)).astype(np.int32)
+        return keys
+
+    def values(self, keys: np.ndarray) -> np.ndarray:
+        keys = np.asarray(keys)
+        if self.kind == "linear":
+            return self.lo + (keys + 0.5) * self.width
+        out = 2 * np.power(self.gamma, keys.astype(float)) / (self.gamma + 1)
+        return np.where(keys == ZERO_KEY, 0.0, out)
+
+    def error_bound(self) -> Dict[str, float | str]:
+        if self.kind == "linear":
+            return {"type": "absolute", "value": self.width / 2}
+        return {"type": "relative", "value": self.alpha}
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch stored as sorted bucket keys with counts.
+
+    Merging is exact (counts add), so sketches built per (period, state)
+    combine into national or multi-period distributions without revisiting
+    rows. ``quantiles`` returns the lower-rank quantile up to the mapping's
+    ``error_bound`` in value; rank is exact at bucket granularity.
+    """
+
+    def __init__(self, mapping: BucketMapping, keys: np.ndarray | None = None, counts: np.ndarray | None = None):
+        self.mapping = mapping
+        self.keys = np.asarray(keys if keys is not None else [], dtype=np.int32)
+        self.counts = np.asarray(counts if counts is not None else [], dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, mapping: BucketMapping, values: Iterable[float]) -> "QuantileSketch":
+        values = np.asarray(values, dtype=float)
+        keys, counts = np.unique(mapping.keys(values[~np.isnan(values)]), return_counts=True)
+        return cls(mapping, keys, counts)
+
+    @classmethod
+    def from_buckets(cls, mapping: BucketMapping, keys: np.ndarray, counts: np.ndarray) -> "QuantileSketch":
+        """Combine possibly repeated ``keys`` (e.g. rows of several stored sketches)."""
+        merged, inverse = np.unique(np.asarray(keys, dtype=np.int32), return_inverse=True)
+        return cls(mapping, merged, np.bincount(inverse, weights=counts, minlength=len(merged)).astype(np.int64))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.mapping != self.mapping:
+            raise ValueError("Cannot merge sketches with different bucket mappings")
+        return QuantileSketch.from_buckets(
+            self.mapping, np.concatenate([self.keys, other.keys]), np.concatenate([self.counts, other.counts])
+        )
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        qs = np.asarray(list(qs), dtype=float)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        ranks = np.floor(qs * (self.count - 1))
+        idx = np.searchsorted(np.cumsum(self.counts), ranks, side="right")
+        return self.mapping.values(self.keys[idx])
+
+    def histogram(self, bins: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """``bins`` equal-width bins between the lowest and highest bucket.
+
+        Each bucket is counted in the bin holding its representative value,
+        so bin edges carry the same error bound as quantiles.
+        """
+        if self.count == 0:
+            return np.array([]), np.array([], dtype=np.int64)
+        reps = self.mapping.values(self.keys)
+        edges = np.linspace(reps.min(), reps.max(), bins + 1)
+        counts, _ = np.histogram(reps, bins=edges, weights=self.counts)
+        return edges, counts.astype(np.int64)
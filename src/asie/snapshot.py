@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# pandas/pyarrow are imported inside the read/write helpers so API workers can
+# read the manifest without paying for them
+SNAPSHOT_DIR = "snapshot"
+MANIFEST_NAME = "manifest.json"
+# Pointer file naming the published version directory; swapped atomically
+CURRENT_NAME = "CURRENT"
+# Changes against the previous version (see asie.diffs), written next to the manifest
+DIFF_NAME = "diff.json"
+
+# Parquet files the API serves; each becomes one uncompressed Arrow IPC file
+SERVED_FILES = [
+    "metrics_state_M.parquet",
+    "metrics_district_M.parquet",
+    "anomalies_state_M.parquet",
+    "anomalies_district_M.parquet",
+    "forecast_state.parquet",
+    "forecast_district.parquet",
+    "rollup_district_period_M.parquet",
+    "rollup_district_state_M.parquet",
+    "rollup_district_period_state_M.parquet",
+    "sketch_district_M.parquet",
+]
+
+
+def _to_serving_frame(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
+    # Forecast periods are pandas Period[M]; store plain timestamps so readers need no conversion
+    if name.startswith("forecast_") and "period" in df.columns and isinstance(df["period"].dtype, pd.PeriodDtype):
+        df = df.assign(period=df["period"].dt.to_timestamp())
+    return df
+
+
+def _content_hash(df: pd.DataFrame) -> str:
+    import pandas as pd
+
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _new_version() -> str:
+    return datetime.now(timezone.utc).strftime("v%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def write_snapshot(processed_root: Path | str, out_dir: Path | str | None = None, keep: int = 3) -> Path:
+    """Publish the served parquet files as a new memory-mappable snapshot version.
+
+    Each call writes uncompressed Arrow IPC files plus a manifest into a fresh
+    ``<out_dir>/<version>/`` directory, then atomically repoints ``CURRENT`` at
+    it, so readers see either the old or the new set, never a mix. The
+    manifest carries the lightweight facts ``/api/meta`` needs (periods,
+    latest period, states) and a content hash per table; ``diff.json`` holds
+    the changed rankings, new anomalies and updated forecast points relative
+    to the previously published version. Only the newest ``keep`` versions
+    are retained; workers still mapping a pruned version keep their mapping
+    on POSIX. Returns the version directory.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    processed_root = Path(processed_root)
+    root = Path(out_dir) if out_dir is not None else processed_root / SNAPSHOT_DIR
+    previous = current_version(root) if root.exists() else None
+    version = _new_version()
+    version_dir = root / version
+    version_dir.mkdir(parents=True, exist_ok=False)
+
+    manifest: Dict[str, Any] = {
+        "version": version,
+        "previous": previous,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tables": {},
+    }
+    for name in SERVED_FILES:
+        src = processed_root / name
+        if not src.exists():
+            continue
+        df = _to_serving_frame(name, pd.read_parquet(src))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        target = version_dir / f"{Path(name).stem}.arrow"
+        with pa.OSFile(str(target), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        manifest["tables"][name] = {
+            "file": target.name,
+            "rows": table.num_rows,
+            "source_mtime": src.stat().st_mtime,
+            "hash": _content_hash(df),
+        }
+        if name.startswith("anomalies_"):
+            from .anomalies import stored_methods
+
+            # The Arrow copy drops parquet metadata; keep the scored methods in the manifest
+            manifest["tables"][name]["methods"] = stored_methods(src)
+
+        if name == "metrics_state_M.parquet" and len(df):
+            periods = sorted(df["period"].dt.strftime("%Y-%m").unique().tolist())
+            manifest["periods"] = periods
+            manifest["latest_period"] = periods[-1]
+            manifest["states"] = sorted(df["state"].dropna().unique().tolist())
+
+    diff = _diff_against(root, previous, version_dir, manifest)
+    (version_dir / DIFF_NAME).write_text(json.dumps(diff), encoding="utf-8")
+    manifest["changed_tables"] = diff["changed_tables"]
+    (version_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+
+    pointer_tmp = root / f"{CURRENT_NAME}.{version}.tmp"
+    pointer_tmp.write_text(version, encoding="utf-8")
+    os.replace(pointer_tmp, root / CURRENT_NAME)
+    _prune_versions(root, keep=keep, current=version)
+    return version_dir
+
+
+def _diff_against(root: Path, previous: Optional[str], version_dir: Path, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    from .diffs import snapshot_diff
+
+    old_manifest = load_manifest(root, previous) if previous else None
+    old_tables = old_manifest["tables"] if old_manifest else {}
+    changed = [
+        name
+        for name, entry in manifest["tables"].items()
+        if old_tables.get(name, {}).get("hash") != entry["hash"]
+    ]
+    changed += [name for name in old_tables if name not in manifest["tables"]]
+
+    def _frames(base: Path, tables: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        return {name: read_frame(base / tables[name]["file"]) for name in changed if name in tables}
+
+    old_frames = _frames(root / previous, old_tables) if old_manifest else {}
+    diff = snapshot_diff(old_frames, _frames(version_dir, manifest["tables"]), changed)
+    return {"version": manifest["version"], "previous": previous, "changed_tables": changed, **diff}
+
+
+def _prune_versions(root: Path, keep: int, current: str) -> List[str]:
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and p.name.startswith("v"))
+    removed = []
+    for name in versions[:-keep] if keep > 0 else versions:
+        if name == current:
+            continue
+        try:
+            shutil.rmtree(root / name)
+            removed.append(name)
+        except OSError:
+            # Mapped files cannot be removed on Windows; try again on the next publish
+            pass
+    return removed
+
+
+def current_version(snapshot_root: Path | str) -> Optional[str]:
+    path = Path(snapshot_root) / CURRENT_NAME
+    try:
+        return path.read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(snapshot_root: Path | str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Manifest of ``version`` (default: the published one), or None."""
+    version = version or current_version(snapshot_root)
+    if version is None:
+        return None
+    path = Path(snapshot_root) / version / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_diff(snapshot_root: Path | str, version: str) -> Optional[Dict[str, Any]]:
+    path = Path(snapshot_root) / version / DIFF_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def diffs_since(snapshot_root: Path | str, since: str, until: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Diffs from ``since`` (exclusive) up to ``until`` (default: published), oldest first.
+
+    Follows each version's ``previous`` link; returns None when the chain no
+    longer reaches ``since`` (pruned or unknown version), in which case the
+    caller should re-fetch everything.
+    """
+    until = until or current_version(snapshot_root)
+    chain: List[Dict[str, Any]] = []
+    version = until
+    while version is not None and version != since:
+        diff = load_diff(snapshot_root, version)
+        if diff is None:
+            return None
+        chain.append(diff)
+        version = diff["previous"]
+    if version != since:
+        return None
+    return chain[::-1]
+
+
+def read_table(path: Path | str) -> pa.Table:
+    """Memory-map an Arrow IPC file; buffers stay backed by the page cache."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    source = pa.memory_map(str(path), "r")
+    return ipc.open_file(source).read_all()
+
+
+def read_frame(path: Path | str) -> pd.DataFrame:
+    # split_blocks avoids consolidating columns into fresh 2-D blocks, so
+    # null-free numeric columns stay read-only views over the mapping that
+    # every worker process shares through the OS page cache
+    return read_table(path).to_pandas(split_blocks=True)
+
+
+class SnapshotReader:
+    """Follows the published snapshot version for a long-running reader.
+
+    ``manifest()`` re-checks ``CURRENT`` at most every ``poll_interval``
+    seconds; on a version switch the new manifest is loaded and every
+    ``on_switch`` callback runs (e.g. to drop cached frames).
+    """
+
+    def __init__(self, root: Path | str, poll_interval: float = 2.0):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self.on_switch: List[Callable[[Optional[str], Optional[str]], None]] = []
+        self._lock = threading.Lock()
+        self._manifest = load_manifest(self.root)
+        self._checked = time.monotonic()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._manifest["version"] if self._manifest else None
+
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        if time.monotonic() - self._checked >= self.poll_interval:
+            self.refresh()
+        return self._manifest
+
+    def refresh(self) -> bool:
+        """Reload if ``CURRENT`` moved; returns True on a version switch."""
+        with self._lock:
+            self._checked = time.monotonic()
+            latest = current_version(self.root)
+            if latest == self.version:
+                return False
+            manifest = load_manifest(self.root, latest) if latest else None
+            if latest and manifest is None:
+                return False  # version directory vanished; keep serving the old one
+            old = self.version
+            self._manifest = manifest
+        for callback in self.on_switch:
+            callback(old, latest)
+        return True
+
+    def path(self, name: str) -> Optional[Path]:
+        manifest = self.manifest()
+        if manifest is None:
+            return None
+        entry = manifest["tables"].get(name)
+        if entry is None:
+            return None
+        return self.root / manifest["version"] / entry["file"]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import DATE_FMT
+
+# Geography size and number of simulated days per scale preset
+SCALES: Dict[str, Dict[str, int]] = {
+    "tiny": {"states": 3, "districts_per_state": 3, "pincodes_per_district": 2, "days": 120},
+    "small": {"states": 8, "districts_per_state": 6, "pincodes_per_district": 4, "days": 270},
+    "medium": {"states": 20, "districts_per_state": 15, "pincodes_per_district": 12, "days": 270},
+    "large": {"states": 36, "districts_per_state": 22, "pincodes_per_district": 8, "days": 300},
+    "national": {"states": 36, "districts_per_state": 22, "pincodes_per_district": 25, "days": 365},
+}
+
+# Raw column layout per dataset, exactly as shipped in the source CSV dumps
+RAW_SCHEMAS: Dict[str, List[str]] = {
+    "enrolment": ["age_0_5", "age_5_17", "age_18_greater"],
+    "demographic": ["demo_age_5_17", "demo_age_17_"],
+    "biometric": ["bio_age_5_17", "bio_age_17_"],
+}
+
+# Mean daily volume per pincode for each age column
+_BASE_RATES = {
+    "age_0_5": 3.0,
+    "age_5_17": 1.5,
+    "age_18_greater": 0.6,
+    "demo_age_5_17": 2.0,
+    "demo_age_17_": 14.0,
+    "bio_age_5_17": 12.0,
+    "bio_age_17_": 10.0,
+}
+
+
+def _geography(rng: np.random.Generator, states: int, districts_per_state: int, pincodes_per_district: int) -> pd.DataFrame:
+    rows = []
+    for s in range(states):
+        state = f"State {s + 1:02d}"
+        for d in range(districts_per_state):
+            district = f"District {s + 1:02d}-{d + 1:02d}"
+            # Pincodes share a 3-digit sorting prefix per district, like real postal circles
+            prefix = 110 + (s * districts_per_state + d) % 780
+            for p in range(pincodes_per_district):
+                rows.append((state, district, f"{prefix:03d}{p + 1:03d}"))
+    geo = pd.DataFrame(rows, columns=["state", "district", "pincode"])
+    # Heavy-tailed activity per pincode (urban hubs vs rural)
+    geo["activity"] = rng.lognormal(mean=0.0, sigma=0.8, size=len(geo))
+    return geo
+
+
+def generate_raw(
+    out_root: Path | str,
+    scale: str = "small",
+    seed: int = 0,
+    start: str = "2025-03-01",
+    rows_per_file: int = 500_000,
+    coverage: float = 0.6,
+    **overrides: int,
+) -> Dict[str, int]:
+    """Write seeded synthetic enrolment/demographic/biometric CSVs under ``out_root``.
+
+    The layout mirrors ``data/raw`` (``<dataset>/api_data_aadhar_<dataset>/*.csv``)
+    with ``dd-mm-yyyy`` dates, state/district/pincode and the per-dataset age
+    columns, so ``run_pipeline(raw_root=out_root)`` consumes it unchanged.
+    ``coverage`` is the share of pincode-days with any activity. Scale presets
+    can be adjusted via ``overrides`` (``states``, ``districts_per_state``,
+    ``pincodes_per_district``, ``days``). Returns rows written per dataset.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"scale must be one of: {', '.join(SCALES)}")
+    params = {**SCALES[scale], **overrides}
+    rng = np.random.default_rng(seed)
+    geo = _geography(rng, params["states"], params["districts_per_state"], params["pincodes_per_district"])
+    dates = pd.date_range(start, periods=params["days"], freq="D")
+
+    # Month-of-year seasonality plus a mild upward trend, shared by all datasets
+    season = 1.0 + 0.25 * np.sin(2 * np.pi * (dates.month.to_numpy() - 3) / 12)
+    trend = np.linspace(1.0, 1.15, len(dates))
+    day_factor = season * trend
+
+    out_root = Path(out_root)
+    written: Dict[str, int] = {}
+    for dataset, value_cols in RAW_SCHEMAS.items():
+        ds_rng = np.random.default_rng([seed, len(written)])
+        active = ds_rng.random((len(geo), len(dates))) < coverage
+        geo_idx, day_idx = np.nonzero(active)
+        lam = geo["activity"].to_numpy()[geo_idx] * day_factor[day_idx]
+        frame = pd.DataFrame(
+            {
+                "date": dates[day_idx].strftime(DATE_FMT),
+                "state": geo["state"].to_numpy()[geo_idx],
+                "district": geo["district"].to_numpy()[geo_idx],
+                "pincode": geo["pincode"].to_numpy()[geo_idx],
+            }
+        )
+        for col in value_cols:
+            frame[col] = ds_rng.poisson(lam * _BASE_RATES[col])
+        # Source dumps are unordered across files
+        frame = frame.sample(frac=1.0, random_state=int(ds_rng.integers(0, 2**31 - 1))).reset_index(drop=True)
+
+        target = out_root / dataset / f"api_data_aadhar_{dataset}"
+        target.mkdir(parents=True, exist_ok=True)
+        for old in target.glob("*.csv"):
+            old.unlink()
+        for offset in range(0, len(frame), rows_per_file):
+            part = frame.iloc[offset : offset + rows_per_file]
+            part.to_csv(target / f"api_data_aadhar_{dataset}_{offset}_{offset + len(part)}.csv", index=False)
+        written[dataset] = len(frame)
+    return written
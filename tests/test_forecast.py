@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from asie import forecast, snapshot, synthetic  # noqa: E402
+from asie.pipeline import run_pipeline  # noqa: E402
+
+
+def test_short_history_keeps_forecast_schema():
+    df = pd.DataFrame(
+        {
+            "period": pd.to_datetime(["2025-01-01", "2025-02-01"]),
+            "state": ["Bihar", "Bihar"],
+            "district": ["Araria", "Araria"],
+            "enrol_total": [10.0, 12.0],
+        }
+    )
+    fc = forecast.forecast_metrics(df, geo_cols=["state", "district"], metrics=["enrol_total"])
+    assert fc.empty
+    assert list(fc.columns) == ["state", "district", "metric", "period", "forecast"]
+    assert isinstance(fc["period"].dtype, pd.PeriodDtype)
+
+
+def test_short_history_runs_publish_snapshots(tmp_path):
+    # 120 days is four months, short of the six forecast_metrics needs
+    raw = tmp_path / "raw"
+    processed = tmp_path / "processed"
+    synthetic.generate_raw(raw, scale="tiny", seed=0)
+    for _ in range(2):
+        run_pipeline(
+            geo_level="state", raw_root=raw, processed_root=processed, report_path=tmp_path / "reports" / "summary.md"
+        )
+        forecast.run_forecasts(processed)
+    assert pd.read_parquet(processed / "forecast_state.parquet").empty
+    manifest = snapshot.load_manifest(processed / snapshot.SNAPSHOT_DIR)
+    assert manifest["tables"]["forecast_state.parquet"]["rows"] == 0
@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from asie import anomalies, synthetic  # noqa: E402
+from asie.pipeline import run_pipeline  # noqa: E402
+
+SPIKE_DATE = "15-06-2025"
+
+
+def _inject_spike(raw_root: Path) -> str:
+    """Add one very large enrolment day for the first state; returns that state."""
+    csv = sorted((raw_root / "enrolment").rglob("*.csv"))[0]
+    df = pd.read_csv(csv, dtype=str)
+    spike = df.iloc[[0]].assign(date=SPIKE_DATE, age_0_5="90000", age_5_17="0", age_18_greater="0")
+    pd.concat([df, spike]).to_csv(csv, index=False)
+    return spike["state"].iloc[0]
+
+
+def _run(tmp_path: Path, **kwargs) -> Tuple[str, Path, pd.DataFrame]:
+    raw = tmp_path / "raw"
+    synthetic.generate_raw(raw, scale="tiny", seed=3, days=540)
+    state = _inject_spike(raw)
+    processed = tmp_path / "processed"
+    run_pipeline(
+        geo_level="state",
+        raw_root=raw,
+        processed_root=processed,
+        report_path=tmp_path / "reports" / "summary.md",
+        **kwargs,
+    )
+    path = processed / "anomalies_state_M.parquet"
+    return state, path, pd.read_parquet(path)
+
+
+def test_injected_spike_is_flagged(tmp_path):
+    state, _, df = _run(tmp_path)
+    assert len(df) > 0
+    hit = df[(df["state"] == state) & (df["metric"] == "enrol_total")]
+    assert pd.Timestamp("2025-06-01") in set(hit["period"])
+    assert (hit["direction"] == "spike").any()
+    # Joint rows are opt-in
+    assert not (df["metric"] == "joint").any()
+
+
+def test_stored_methods_are_recorded(tmp_path):
+    _, path, df = _run(tmp_path, anomaly_methods=("zscore", "mad"))
+    assert anomalies.stored_methods(path) == ["zscore", "mad"]
+    assert set(df["method"]) <= {"zscore", "mad"}
+
+
+def test_sharded_scoring_matches_serial():
+    periods = pd.date_range("2024-01-01", periods=18, freq="MS")
+    df = pd.DataFrame(
+        {
+            "period": list(periods) * 4,
+            "state": [s for s in ["A", "B", "C", "D"] for _ in periods],
+            "enrol_total": [100.0 + (i % 5) for i in range(72)],
+            "demo_total": [50.0 + (i % 3) for i in range(72)],
+        }
+    )
+    # Only state A spikes, so the other shards flag nothing
+    df.loc[10, "enrol_total"] = 5000.0
+    kwargs = dict(
+        value_cols=["enrol_total", "demo_total"],
+        group_keys=["state"],
+        method=["zscore", "mad"],
+        joint_min_metrics=2,
+    )
+    serial = anomalies.detect_anomalies(df, workers=1, **kwargs)
+    sharded = anomalies.detect_anomalies(df, workers=2, **kwargs)
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(serial, sharded)